@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+analyze_content本地特征提取的微基准
+
+对比原实现（每条内容重新编译emoji正则、逐个re.search标题党特征）
+和预编译正则注册表（单个交替正则 + 单次emoji扫描）的吞吐量。
+
+运行: python benchmarks/bench_analyze_content.py [条数]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.text_patterns import clickbait_score, emoji_density
+
+TITLES = [
+    "震惊！我国芯片技术取得重大突破",
+    "重磅突发：航天工程再创新纪录",
+    "速看，原来真相竟然是这样",
+    "国产大飞机完成首次商业飞行",
+    "量子计算研究获得新进展",
+    "秘密武器曝光，网友惊呆了"
+]
+CONTENTS = [
+    "近日，我国在人工智能领域取得重要突破，相关技术达到国际领先水平。",
+    "太厉害了🎉🎉 国产手机销量再创新高🚀，网友纷纷点赞👍",
+    "According to the report, China's economy grew steadily in the third quarter.",
+    "据新华社报道，新一代运载火箭成功发射，任务取得圆满成功。"
+]
+
+
+def build_corpus(size: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {"title": rng.choice(TITLES), "content": rng.choice(CONTENTS) * rng.randint(1, 5)}
+        for _ in range(size)
+    ]
+
+
+def legacy_features(item):
+    """原实现：每次调用重新编译emoji正则，10个特征逐个搜索"""
+    content_text = item["content"]
+    emoji_pattern = re.compile(
+        "["
+        "\U0001F600-\U0001F64F"
+        "\U0001F300-\U0001F5FF"
+        "\U0001F680-\U0001F6FF"
+        "\U0001F1E0-\U0001F1FF"
+        "]+",
+        flags=re.UNICODE
+    )
+    emoji_count = len(emoji_pattern.findall(content_text))
+    density = emoji_count / max(1, len(content_text))
+
+    title = item.get("title", "")
+    clickbait_patterns = [
+        r"震惊", r"惊呆", r"吓尿", r"重磅", r"突发",
+        r"速看", r"竟然", r"原来", r"真相", r"秘密"
+    ]
+    score = 0
+    for pattern in clickbait_patterns:
+        if re.search(pattern, title):
+            score += 0.1
+    return density, min(1.0, score)
+
+
+def registry_features(item):
+    """预编译正则注册表"""
+    return emoji_density(item["content"]), clickbait_score(item.get("title", ""))
+
+
+def measure(fn, corpus, repeat: int = 3) -> float:
+    """取多次运行中最快的一次，返回每秒处理条数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in corpus:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    corpus = build_corpus(size)
+
+    # 两种实现结果必须一致
+    for item in corpus[:500]:
+        legacy, new = legacy_features(item), registry_features(item)
+        assert legacy[0] == new[0] and abs(legacy[1] - new[1]) < 1e-9, (item, legacy, new)
+
+    before = measure(legacy_features, corpus)
+    after = measure(registry_features, corpus)
+
+    print(f"语料: {size}条")
+    print(f"原实现:       {before:>12,.0f} 条/秒")
+    print(f"预编译注册表: {after:>12,.0f} 条/秒")
+    print(f"提升:         {after / before:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
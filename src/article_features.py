@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# 文章特征存储
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .embedding_index import content_key
+from .keyword_matcher import labelled_automaton
+
+# 来源分类关键词（按优先级排列）
+SOURCE_TYPE_PRIORITY = ("official_media", "tech_media", "academic")
+SOURCE_TYPE_MATCHER = labelled_automaton({
+    "official_media": ["人民", "新华", "央视", "求是", "学习强国"],
+    "tech_media": ["科技", "创新", "数码", "it", "人工智能"],
+    "academic": ["大学", "学院", "研究", "科学", "学术"]
+})
+
+# 内容类型关键词（按优先级排列）
+CONTENT_TYPE_PRIORITY = ("tech", "politics", "economy", "social")
+CONTENT_TYPE_MATCHER = labelled_automaton({
+    "tech": ["tech", "ai", "5g", "quantum", "space", "航天", "科技", "人工智能", "量子", "computer", "software"],
+    "politics": ["politics", "外交", "政策", "government", "习近平", "中国", "china", "political", "election"],
+    "economy": ["economy", "经济", "金融", "market", "trade", "贸易", "stock", "bank", "finance"],
+    "social": ["social", "微博", "知乎", "weibo", "zhihu", "trending", "hot"]
+})
+
+
+def classify_source(source: str) -> str:
+    """分类来源类型（官方媒体 > 科技媒体 > 学术来源 > 主流媒体）"""
+    source_types = SOURCE_TYPE_MATCHER.find_labels(source.lower())
+    for source_type in SOURCE_TYPE_PRIORITY:
+        if source_type in source_types:
+            return source_type
+    return "mainstream_media"
+
+
+def infer_content_type(title: str, source: str) -> str:
+    """根据标题关键词和来源推断内容类型"""
+    content_types = CONTENT_TYPE_MATCHER.find_labels(title.lower())
+    for content_type in CONTENT_TYPE_PRIORITY:
+        if content_type in content_types:
+            return content_type
+    source = source.lower()
+    if "微博" in source or "知乎" in source:
+        return "social"
+    return "general"
+
+
+def text_features(items: List[Dict]) -> List[Dict]:
+    """与用户配置无关的基础文本特征"""
+    return [
+        {
+            "content_length": len(item.get("content", "")),
+            "title_length": len(item.get("title", "")),
+            "source_type": classify_source(item.get("source", "")),
+            "content_type": infer_content_type(item.get("title", ""), item.get("source", ""))
+        }
+        for item in items
+    ]
+
+
+def keyword_group(name: str, keywords: Iterable[str]) -> str:
+    """依赖关键词列表的特征组名（关键词变化后自动换组，旧结果不再命中）"""
+    digest = hashlib.sha1("\x00".join(sorted(keywords)).encode('utf-8')).hexdigest()[:8]
+    return f"{name}:{digest}"
+
+
+class ArticleFeatureStore:
+    """按内容键保存的文章特征
+
+    特征按组（如 text、local_analysis、exclude:<关键词摘要>）在第一次需要时
+    整批计算，保存在进程内LRU和SQLite中。早、午、晚三次运行处理同一批
+    近几天的文章时，不再重复扫描原文。db_path为None时只在内存中保存。
+    """
+
+    def __init__(self,
+                 db_path: Optional[str] = "./cache/article_features.db",
+                 ttl_days: float = 7,
+                 memory_entries: int = 20000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_days * 86400
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()  # (content_key, group) -> features
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "computed": 0}
+
+        self.conn = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS features ("
+                "key TEXT NOT NULL, grp TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (key, grp))"
+            )
+            # 打开时清理过期特征
+            self.conn.execute("DELETE FROM features WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self.conn.commit()
+
+    def lookup(self,
+               items: List[Dict],
+               group: str,
+               compute: Callable[[List[Dict]], List[Dict]]) -> List[Dict]:
+        """取一批文章的某组特征，缺失的整批计算后保存
+
+        返回的是每组特征字典的浅副本，调用方可以修改顶层字段。
+        """
+        keys = [item.setdefault("content_key", content_key(item)) for item in items]
+        found = {}
+
+        with self.lock:
+            for key in keys:
+                cached = self.memory.get((key, group))
+                if cached is not None:
+                    self.memory.move_to_end((key, group))
+                    found[key] = cached
+            self.stats["memory_hits"] += len(found)
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self.conn:
+                for key, features in self.load(missing, group).items():
+                    found[key] = features
+                    self.remember(key, group, features)
+                    self.stats["disk_hits"] += 1
+
+        pending = {}
+        for key, item in zip(keys, items):
+            if key not in found and key not in pending:
+                pending[key] = item
+
+        if pending:
+            computed = compute(list(pending.values()))
+            with self.lock:
+                for key, features in zip(pending, computed):
+                    found[key] = features
+                    self.remember(key, group, features)
+                self.stats["computed"] += len(pending)
+                self.save(group, {key: found[key] for key in pending})
+
+        return [dict(found[key]) for key in keys]
+
+    def lookup_one(self, item: Dict, group: str, compute: Callable[[List[Dict]], List[Dict]]) -> Dict:
+        """取单篇文章的某组特征"""
+        return self.lookup([item], group, compute)[0]
+
+    def text_features(self, items: List[Dict]) -> List[Dict]:
+        """基础文本特征（长度、来源类型、内容类型）"""
+        return self.lookup(items, "text", text_features)
+
+    def load(self, keys: List[str], group: str) -> Dict[str, Dict]:
+        """从SQLite读取（调用方持有锁）"""
+        cutoff = time.time() - self.ttl_seconds
+        loaded = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, data FROM features WHERE grp = ? AND created_at >= ? AND key IN ({placeholders})",
+                [group, cutoff] + chunk
+            ).fetchall()
+            for key, data in rows:
+                loaded[key] = json.loads(data)
+        return loaded
+
+    def save(self, group: str, features: Dict[str, Dict]):
+        """写入SQLite（调用方持有锁，一批一个事务）"""
+        if not self.conn or not features:
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO features (key, grp, data, created_at) VALUES (?, ?, ?, ?)",
+            [(key, group, json.dumps(data, ensure_ascii=False), now) for key, data in features.items()]
+        )
+        self.conn.commit()
+
+    def remember(self, key: str, group: str, features: Dict):
+        """放入进程内LRU（调用方持有锁）"""
+        self.memory[(key, group)] = features
+        self.memory.move_to_end((key, group))
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def close(self):
+        """关闭数据库"""
+        with self.lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+    def get_stats(self) -> Dict:
+        """获取命中统计"""
+        with self.lock:
+            stats = self.stats.copy()
+            stats["memory_entries"] = len(self.memory)
+        return stats
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# 批量向量化评分
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# 内容质量分：特征列及权重
+QUALITY_FEATURES = ("爱国程度", "科技相关性", "正式程度", "情感正向", "标题党惩罚")
+QUALITY_WEIGHTS = np.array([0.3, 0.25, 0.2, 0.15, 0.1])
+
+# 推荐分：特征列及默认权重（黑名单惩罚为负权重）
+RECOMMENDATION_FEATURES = (
+    "topic_score",
+    "style_score",
+    "source_score",
+    "time_score",
+    "freshness_score",
+    "quality_score",
+    "blacklist_penalty"
+)
+DEFAULT_RECOMMENDATION_WEIGHTS = {
+    "topic_score": 0.35,
+    "style_score": 0.20,
+    "source_score": 0.15,
+    "time_score": 0.10,
+    "freshness_score": 0.05,
+    "quality_score": 0.15,
+    "blacklist_penalty": -0.1  # 惩罚项
+}
+
+
+def weight_vector(weights: Dict[str, float], features: Sequence[str] = RECOMMENDATION_FEATURES) -> np.ndarray:
+    """按特征列顺序把权重字典转成向量"""
+    return np.array([weights[name] for name in features], dtype=float)
+
+
+def column(analyses: List[Dict], field: str, default: float) -> np.ndarray:
+    """从分析结果中取出一列"""
+    return np.array([analysis.get(field, default) for analysis in analyses], dtype=float)
+
+
+def quality_feature_matrix(analyses: List[Dict]) -> np.ndarray:
+    """内容质量特征矩阵（N × 5）"""
+    return np.column_stack([
+        column(analyses, "patriotic_level", 0.5),
+        column(analyses, "tech_relevance", 0.5),
+        column(analyses, "formality", 0.5),
+        np.maximum(0, column(analyses, "sentiment_score", 0)),
+        1 - column(analyses, "clickbait_score", 0)
+    ])
+
+
+def quality_scores(analyses: List[Dict], rewritten: Sequence[bool]) -> np.ndarray:
+    """批量计算内容质量分（重写内容加分）"""
+    if not analyses:
+        return np.zeros(0)
+    scores = quality_feature_matrix(analyses) @ QUALITY_WEIGHTS
+    bonus = np.minimum(1.0, scores * 1.1)
+    return np.where(np.asarray(rewritten, dtype=bool), bonus, scores)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """分数最高的k个下标，按分数降序（同分按下标升序，与稳定排序的前k个一致）
+
+    用部分选择（np.partition）找到第k大的分数，只对前k个排序，候选很多时不做全量排序。
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=int)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+
+    kth = np.partition(scores, n - k)[n - k]
+    greater = np.flatnonzero(scores > kth)
+    equal = np.flatnonzero(scores == kth)[:k - len(greater)]
+    indices = np.concatenate([greater, equal])
+    return indices[np.lexsort((indices, -scores[indices]))]
+
+
+def tag_jaccard_matrix(tag_lists: List[Sequence[str]]) -> np.ndarray:
+    """两两之间的标签Jaccard相似度（N × N）"""
+    vocabulary = {}
+    for tags in tag_lists:
+        for tag in tags:
+            vocabulary.setdefault(tag, len(vocabulary))
+
+    membership = np.zeros((len(tag_lists), max(1, len(vocabulary))))
+    for row, tags in enumerate(tag_lists):
+        for tag in tags:
+            membership[row, vocabulary[tag]] = 1.0
+
+    intersection = membership @ membership.T
+    sizes = membership.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def cosine_matrix(vectors: np.ndarray) -> np.ndarray:
+    """两两之间的余弦相似度（N × N）"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    normalized = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    return normalized @ normalized.T
+
+
+def mmr_select(relevance: np.ndarray, similarity: np.ndarray, count: int, diversity_lambda: float = 0.7) -> List[int]:
+    """最大边际相关性（MMR）选择
+
+    每一步选 λ·相关性 − (1−λ)·与已选内容的最大相似度 最高的候选。
+    """
+    n = len(relevance)
+    chosen = np.zeros(n, dtype=bool)
+    max_similarity = np.zeros(n)
+    order = []
+
+    for _ in range(min(count, n)):
+        mmr = diversity_lambda * relevance - (1 - diversity_lambda) * max_similarity
+        mmr[chosen] = -np.inf
+        best = int(np.argmax(mmr))
+        order.append(best)
+        chosen[best] = True
+        max_similarity = np.maximum(max_similarity, similarity[best])
+
+    return order
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# 分块并行翻译
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .deadline import bind_deadline
+from .llm_backend import estimate_tokens
+from .translation_memory import TranslationMemory
+
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+# 句子：以中文句末标点结束，或以西文句末标点+空白结束（避免切开3.5这样的小数）
+SENTENCE_PATTERN = re.compile(r".*?(?:[。！？；]+|[.!?;]+(?=\s)|$)\s*", re.S)
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    """按句切分段落，保留句末标点和空白"""
+    return [s for s in SENTENCE_PATTERN.findall(paragraph) if s]
+
+
+def split_into_chunks(text: str, max_chunk_tokens: int) -> List[Tuple[str, str]]:
+    """按段落和句子边界把文本切成不超过max_chunk_tokens的块
+
+    返回[(块文本, 块后分隔符)]，分隔符用于按原顺序拼接译文。
+    """
+
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush(separator: str):
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(("".join(current).strip(), separator))
+            current = []
+            current_tokens = 0
+
+    paragraphs = [p for p in PARAGRAPH_SPLIT.split(text) if p.strip()]
+
+    for paragraph in paragraphs:
+        paragraph_tokens = estimate_tokens(paragraph)
+
+        # 整段能放进当前块
+        if current_tokens + paragraph_tokens <= max_chunk_tokens:
+            if current:
+                current.append("\n\n")
+            current.append(paragraph)
+            current_tokens += paragraph_tokens
+            continue
+
+        flush("\n\n")
+
+        if paragraph_tokens <= max_chunk_tokens:
+            current.append(paragraph)
+            current_tokens = paragraph_tokens
+            continue
+
+        # 超长段落按句切分；单句超长时单独成块
+        for sentence in split_sentences(paragraph):
+            sentence_tokens = estimate_tokens(sentence)
+            if current and current_tokens + sentence_tokens > max_chunk_tokens:
+                flush("")
+            current.append(sentence)
+            current_tokens += sentence_tokens
+        flush("\n\n")
+
+    flush("")
+
+    # 最后一块之后不需要分隔符
+    if chunks:
+        chunks[-1] = (chunks[-1][0], "")
+    return chunks
+
+
+class ChunkedTranslator:
+    """分块并行翻译器
+
+    长文按段落/句子边界切成token受限的块，并发翻译后按原顺序拼接，
+    总耗时取决于最长的块而不是整篇文章。
+
+    配置翻译记忆后按句处理：已翻译过的句子直接复用，
+    只把没见过的句子编号成批发送。
+    """
+
+    def __init__(self,
+                 translate_fn: Callable[[str, str, int], Optional[str]],
+                 max_chunk_tokens: int = 800,
+                 max_workers: int = 4,
+                 segments_fn: Callable[[List[str], str, int], Optional[List[str]]] = None,
+                 memory: TranslationMemory = None):
+        """
+        Args:
+            translate_fn: 翻译单个块的函数 (text, target_lang, max_tokens) -> 译文或None
+            max_chunk_tokens: 每块的输入token上限
+            max_workers: 并发翻译的块数
+            segments_fn: 逐句翻译一批句子的函数 (sentences, target_lang, max_tokens) -> 译文列表或None
+            memory: 句子级翻译记忆
+        """
+        self.translate_fn = translate_fn
+        self.segments_fn = segments_fn
+        self.memory = memory
+        self.max_chunk_tokens = max_chunk_tokens
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate")
+        self.stats = {
+            "documents": 0,
+            "chunks": 0,
+            "failed_chunks": 0
+        }
+
+    def translate(self, text: str, target_lang: str = "zh") -> Optional[str]:
+        """翻译文本（超过块上限时分块并行）"""
+
+        if not text or not text.strip():
+            return text
+
+        self.stats["documents"] += 1
+        
+        if self.memory is not None and self.segments_fn is not None:
+            return self.translate_with_memory(text, target_lang)
+        
+        chunks = split_into_chunks(text, self.max_chunk_tokens)
+
+        if len(chunks) <= 1:
+            self.stats["chunks"] += 1
+            return self.translate_fn(text, target_lang, self.output_budget(text))
+
+        translations = list(self.executor.map(
+            bind_deadline(lambda chunk: self.translate_fn(chunk[0], target_lang, self.output_budget(chunk[0]))),
+            chunks
+        ))
+
+        self.stats["chunks"] += len(chunks)
+
+        if all(translated is None for translated in translations):
+            self.stats["failed_chunks"] += len(chunks)
+            return None
+
+        # 按原顺序拼接；失败的块保留原文，避免整篇译文被截断
+        parts = []
+        for (chunk_text, separator), translated in zip(chunks, translations):
+            if translated is None:
+                self.stats["failed_chunks"] += 1
+                translated = chunk_text
+            parts.append(translated.strip() + separator)
+
+        return "".join(parts)
+
+    def translate_with_memory(self, text: str, target_lang: str) -> Optional[str]:
+        """按句翻译：命中翻译记忆的句子直接复用，其余句子批量翻译"""
+
+        paragraphs = []
+        translations = {}
+        pending = {}
+
+        for paragraph in PARAGRAPH_SPLIT.split(text):
+            if not paragraph.strip():
+                continue
+            sentences = []
+            for sentence in split_sentences(paragraph):
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+                key = self.memory.make_key(sentence, target_lang)
+                sentences.append((key, sentence))
+                if key in translations or key in pending:
+                    continue
+                cached = self.memory.get(key)
+                if cached is not None:
+                    translations[key] = cached
+                else:
+                    pending[key] = sentence
+            paragraphs.append(sentences)
+
+        if pending:
+            batches = self.batch_segments(list(pending.items()))
+            results = list(self.executor.map(
+                bind_deadline(lambda batch: self.translate_batch(batch, target_lang)), 
+                batches
+            ))
+            self.stats["chunks"] += len(batches)
+
+            for batch, batch_result in zip(batches, results):
+                for (key, sentence), translated in zip(batch, batch_result):
+                    if translated is None:
+                        self.stats["failed_chunks"] += 1
+                        continue
+                    translations[key] = translated
+                    self.memory.put(key, translated)
+
+            self.memory.save()
+
+            if not translations:
+                return None
+
+        # 按原顺序拼接；翻译失败的句子保留原文
+        joiner = "" if target_lang in ("zh", "中文") else " "
+        return "\n\n".join(
+            joiner.join(translations.get(key, sentence) for key, sentence in sentences)
+            for sentences in paragraphs
+        )
+
+    def batch_segments(self, segments: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """把待翻译句子按token上限分批"""
+        batches = []
+        current = []
+        current_tokens = 0
+        for key, sentence in segments:
+            tokens = estimate_tokens(sentence)
+            if current and current_tokens + tokens > self.max_chunk_tokens:
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append((key, sentence))
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def translate_batch(self, batch: List[Tuple[str, str]], target_lang: str) -> List[Optional[str]]:
+        """翻译一批句子；编号对不齐时退回逐句翻译"""
+        sentences = [sentence for _, sentence in batch]
+        budget = self.output_budget("".join(sentences))
+
+        translated = self.segments_fn(sentences, target_lang, budget)
+        if translated is not None and len(translated) == len(sentences):
+            return translated
+
+        return [self.translate_fn(sentence, target_lang, self.output_budget(sentence)) for sentence in sentences]
+
+    def output_budget(self, text: str) -> int:
+        """按输入长度估算译文的max_tokens"""
+        return min(8000, estimate_tokens(text) * 2 + 200)
+
+    def get_stats(self) -> Dict:
+        """获取翻译统计"""
+        return self.stats.copy()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# 熔断器与退避
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """带全抖动的指数退避：在[0, min(cap, base * 2^attempt)]内随机取值"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """熔断器
+
+    closed：正常放行，连续失败达到阈值后转为open
+    open：直接拒绝（快速失败），冷却期过后转为half_open
+    half_open：放行少量探测请求，成功则closed，失败则重新open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.lock = threading.Lock()
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.half_open_calls = 0
+        self.stats = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0
+        }
+
+    @property
+    def state(self) -> str:
+        """当前状态（冷却期结束的open视为half_open）"""
+        with self.lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() >= self.opened_until:
+            self._state = self.HALF_OPEN
+            self.half_open_calls = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """是否放行请求"""
+        with self.lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self.half_open_calls < self.half_open_max_calls:
+                self.half_open_calls += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def is_open(self) -> bool:
+        """熔断中（下游应直接走本地降级方案）"""
+        return self.state == self.OPEN
+
+    def retry_in(self) -> float:
+        """距离下次允许探测的秒数"""
+        with self.lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(0.0, self.opened_until - time.monotonic())
+
+    def record_success(self):
+        """记录成功"""
+        with self.lock:
+            self.stats["successes"] += 1
+            self.consecutive_failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        """记录失败；服务端给出Retry-After时至少熔断到该时间之后"""
+        with self.lock:
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            state = self._current_state()
+
+            if state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold or retry_after:
+                cooldown = retry_after if retry_after else self.recovery_timeout
+                self.opened_until = time.monotonic() + cooldown
+                if self._state != self.OPEN:
+                    self.stats["opened"] += 1
+                self._state = self.OPEN
+
+    def get_stats(self) -> Dict:
+        """获取熔断统计"""
+        with self.lock:
+            stats = self.stats.copy()
+            stats["state"] = self._current_state()
+            stats["consecutive_failures"] = self.consecutive_failures
+        return stats
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **options) -> CircuitBreaker:
+    """获取进程内共享的熔断器（同名只创建一次）"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **options)
+        return _breakers[name]
@@ -4,15 +4,51 @@
 import os
 import json
 import time
+import random
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import re
 
+import numpy as np
+
+from .article_features import ArticleFeatureStore, keyword_group
+from .batch_scoring import quality_scores
+from .deadline import bind_deadline
+from .keyword_matcher import KeywordAutomaton, labelled_automaton
+from .local_analyzer import LocalContentAnalyzer
+from .rewrite_cache import RewriteCache
+from .text_patterns import clickbait_score, emoji_density
+
+PROCESS_STAGES = ("checks", "analysis", "rewrite", "finish")
+
+# 爱国关键词增强
+PATRIOTIC_PATTERNS = {
+    "中国": ["伟大的中国", "繁荣昌盛的中国"],
+    "发展": ["蓬勃发展", "高质量发展"],
+    "成就": ["辉煌成就", "举世瞩目的成就"],
+    "技术": ["自主创新技术", "领先技术"],
+    "突破": ["重大突破", "历史性突破"]
+}
+PATRIOTIC_MATCHER = KeywordAutomaton(PATRIOTIC_PATTERNS)
+
+# 基础检查的必要字段
+REQUIRED_FIELDS = ("content", "source")
+
+# 根据内容添加的标签
+TAG_MATCHER = labelled_automaton({
+    "科技": ["科技", "技术"],
+    "爱国": ["中国", "国家"],
+    "成就": ["突破", "成就"]
+})
+
 class ContentProcessor:
     """内容处理引擎"""
     
-    def __init__(self, deepseek_client, config_path: str):
+    def __init__(self, deepseek_client, config_path: str, feature_store: Optional[ArticleFeatureStore] = None):
         self.deepseek = deepseek_client
         self.config = self.load_config(config_path)
         self.cache_dir = "./cache"
@@ -20,8 +56,51 @@ class ContentProcessor:
             "processed": 0,
             "rewritten": 0,
             "filtered": 0,
-            "passed": 0
+            "passed": 0,
+            "local_analyses": 0,
+            "llm_analyses": 0
         }
+        self.stats_lock = threading.Lock()
+        
+        # 黑名单关键词自动机（配置只在初始化时加载，构建一次）
+        exclude_keywords = self.config.get("content_sources", {}).get("exclude_keywords", [])
+        self.exclude_matcher = KeywordAutomaton(exclude_keywords)
+        
+        # 文章特征存储（与推荐引擎共用）：同一篇文章的关键词扫描和本地分析只做一次
+        self.feature_store = feature_store
+        self.exclude_group = keyword_group("exclude", exclude_keywords)
+        
+        # 批处理各阶段累计耗时（秒）
+        self.stage_seconds = {stage: 0.0 for stage in PROCESS_STAGES}
+        self.batches = 0
+        
+        # 重写缓存：进程内LRU + 单文件SQLite
+        processing_config = self.config.get("processing", {})
+        if processing_config.get("cache_enabled", True):
+            cache_config = processing_config.get("rewrite_cache", {})
+            self.rewrite_cache = RewriteCache(
+                db_path=cache_config.get("path", os.path.join(self.cache_dir, "rewrite_cache.db")),
+                ttl_hours=processing_config.get("cache_ttl_hours", 24),
+                max_entries=cache_config.get("max_entries", 10000),
+                memory_entries=cache_config.get("memory_entries", 512),
+                purge_interval=cache_config.get("purge_interval", 3600)
+            )
+        else:
+            self.rewrite_cache = None
+        
+        # LLM分析和重写的并发线程池
+        max_workers = self.config.get("processing", {}).get("max_workers", 4)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="process")
+        
+        # 本地分析器（仅不确定内容才调用DeepSeek）
+        local_config = self.config.get("processing", {}).get("local_analysis", {})
+        if local_config.get("enabled", True):
+            self.local_analyzer = LocalContentAnalyzer(
+                uncertainty_margin=local_config.get("uncertainty_margin", 0.1)
+            )
+        else:
+            self.local_analyzer = None
+        self.local_analysis_group = f"local_analysis:{local_config.get('uncertainty_margin', 0.1)}"
         
     def load_config(self, config_path: str) -> Dict:
         """加载配置"""
@@ -29,14 +108,28 @@ class ContentProcessor:
         with open(config_path, 'r', encoding='utf-8') as f:
             return yaml.safe_load(f)
     
+    def count(self, key: str, amount: int = 1):
+        """累加统计（批处理时多个线程同时更新）"""
+        with self.stats_lock:
+            self.stats[key] += amount
+    
+    @contextmanager
+    def timed_stage(self, stage: str):
+        """记录批处理阶段耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[stage] += time.perf_counter() - start
+    
     def process_content_item(self, item: Dict) -> Optional[Dict]:
         """处理单个内容项"""
         
-        self.stats["processed"] += 1
+        self.count("processed")
         
         # 1. 基础检查
         if not self.basic_checks(item):
-            self.stats["filtered"] += 1
+            self.count("filtered")
             return None
         
         # 2. 风格分析
@@ -44,102 +137,209 @@ class ContentProcessor:
         
         # 3. 决策处理
         if analysis["recommended_action"] == "filter":
-            self.stats["filtered"] += 1
+            self.count("filtered")
             return None
         
         # 4. 内容重写（如果需要）
+        rewritten = None
         if analysis["recommended_action"] == "rewrite":
             rewritten = self.rewrite_content(item, analysis)
-            if rewritten:
-                item["content"] = rewritten
-                item["was_rewritten"] = True
-                item["original_style"] = analysis
-                self.stats["rewritten"] += 1
+        
+        # 5-6. 情感增强和质量评分
+        return self.finish_item(item, analysis, rewritten)
+    
+    def process_batch(self, items: List[Dict]) -> List[Optional[Dict]]:
+        """批量处理内容项，按输入顺序返回结果（被过滤的为None）
+        
+        本地检查和本地分析一次性完成，需要DeepSeek的分析和重写通过线程池并发执行。
+        """
+        
+        self.count("processed", len(items))
+        self.batches += 1
+        results = [None] * len(items)
+        
+        # 1. 基础检查 + 本地批量分析
+        with self.timed_stage("checks"):
+            passed = self.basic_checks_batch(items)
+            indices = [i for i, ok in enumerate(passed) if ok]
+            self.count("filtered", len(items) - len(indices))
+            checked = [items[i] for i in indices]
+            local_results = self.local_analyses(checked)
+        
+        # 2. 分析：本地结论不确定的项并发交给DeepSeek
+        with self.timed_stage("analysis"):
+            analyses = list(self.executor.map(bind_deadline(self.resolve_analysis), checked, local_results))
+        
+        kept = []
+        for index, item, analysis in zip(indices, checked, analyses):
+            if analysis["recommended_action"] == "filter":
+                self.count("filtered")
             else:
-                # 重写失败，根据严重程度决定
-                if analysis.get("clickbait_score", 0) > 0.7:
-                    self.stats["filtered"] += 1
-                    return None
+                kept.append((index, item, analysis))
+        
+        # 3. 并发重写
+        with self.timed_stage("rewrite"):
+            rewrite_jobs = {
+                index: self.executor.submit(bind_deadline(self.rewrite_content), item, analysis)
+                for index, item, analysis in kept
+                if analysis["recommended_action"] == "rewrite"
+            }
+            rewrites = {index: job.result() for index, job in rewrite_jobs.items()}
+        
+        # 4. 情感增强，质量分整批向量化计算
+        with self.timed_stage("finish"):
+            finished = []
+            for index, item, analysis in kept:
+                item = self.finish_item(item, analysis, rewrites.get(index), score=False)
+                if item:
+                    finished.append((index, item, analysis))
+            
+            scores = self.calculate_quality_scores(
+                [item for _, item, _ in finished], 
+                [analysis for _, _, analysis in finished]
+            )
+            for (index, item, _), score in zip(finished, scores):
+                item["quality_score"] = float(score)
+                results[index] = item
         
-        # 5. 情感增强
+        return results
+    
+    def finish_item(self, 
+                    item: Dict, 
+                    analysis: Dict, 
+                    rewritten: Optional[str], 
+                    score: bool = True) -> Optional[Dict]:
+        """应用重写结果，完成情感增强和质量评分（score=False时由调用方批量评分）"""
+        
+        if rewritten:
+            item["content"] = rewritten
+            item["was_rewritten"] = True
+            item["original_style"] = analysis
+            self.count("rewritten")
+        elif analysis["recommended_action"] == "rewrite":
+            # 重写失败，根据严重程度决定
+            if analysis.get("clickbait_score", 0) > 0.7:
+                self.count("filtered")
+                return None
+        
+        # 情感增强
         item = self.enhance_content(item)
         
-        # 6. 质量评分
-        item["quality_score"] = self.calculate_quality_score(item, analysis)
+        # 质量评分
+        if score:
+            item["quality_score"] = self.calculate_quality_score(item, analysis)
         
-        self.stats["passed"] += 1
+        self.count("passed")
         return item
     
     def basic_checks(self, item: Dict) -> bool:
         """基础检查"""
+        return self.basic_checks_batch([item])[0]
+    
+    def basic_checks_batch(self, items: List[Dict]) -> List[bool]:
+        """批量基础检查（黑名单关键词整批查特征存储）"""
         
         # 检查必要字段
-        required_fields = ["content", "source"]
-        for field in required_fields:
-            if field not in item or not item[field]:
-                return False
-        
-        # 检查黑名单关键词
-        blacklist = self.config.get("content_sources", {}).get("exclude_keywords", [])
-        content_text = f"{item.get('title', '')} {item.get('content', '')}"
-        
-        for keyword in blacklist:
-            if keyword in content_text:
+        complete = [all(item.get(field) for field in REQUIRED_FIELDS) for item in items]
+        keywords = iter(self.excluded_keywords([item for item, ok in zip(items, complete) if ok]))
+        
+        results = []
+        for item, ok in zip(items, complete):
+            if not ok:
+                results.append(False)
+                continue
+            
+            # 检查黑名单关键词
+            keyword = next(keywords)
+            if keyword:
                 print(f"过滤：包含黑名单关键词 '{keyword}'")
-                return False
+                results.append(False)
+                continue
+            
+            # 检查长度（降低要求，特别是对于外文内容）
+            content = item.get("content", "")
+            if len(content) < 20:  # 降低到20字符
+                print(f"过滤：内容过短 ({len(content)}字符)")
+                results.append(False)
+                continue
+            
+            # 对于外文内容，即使较短也先保留进行翻译
+            if item.get("needs_translation", False) and len(content) < 50:
+                print(f"外文内容较短 ({len(content)}字符)，但保留进行翻译")
+            
+            results.append(True)
         
-        # 检查长度（降低要求，特别是对于外文内容）
-        content = item.get("content", "")
-        if len(content) < 20:  # 降低到20字符
-            print(f"过滤：内容过短 ({len(content)}字符)")
-            return False
+        return results
+    
+    def excluded_keywords(self, items: List[Dict]) -> List[Optional[str]]:
+        """每篇文章命中的第一个黑名单关键词（未命中为None）"""
         
-        # 对于外文内容，即使较短也先保留进行翻译
-        if item.get("needs_translation", False) and len(content) < 50:
-            print(f"外文内容较短 ({len(content)}字符)，但保留进行翻译")
-            return True  # 仍然通过检查
+        def scan(batch: List[Dict]) -> List[Dict]:
+            return [
+                {"keyword": self.exclude_matcher.first(f"{item.get('title', '')} {item.get('content', '')}")}
+                for item in batch
+            ]
         
-        return True
+        if self.feature_store:
+            features = self.feature_store.lookup(items, self.exclude_group, scan)
+        else:
+            features = scan(items)
+        return [feature["keyword"] for feature in features]
+    
+    def local_analyses(self, items: List[Dict]) -> List[Optional[Dict]]:
+        """本地分析结果（有特征存储时每篇文章只分析一次）"""
+        
+        if not self.local_analyzer:
+            return [None] * len(items)
+        if self.feature_store:
+            return self.feature_store.lookup(items, self.local_analysis_group, self.local_analyzer.analyze_batch)
+        return self.local_analyzer.analyze_batch(items)
     
     def analyze_content(self, item: Dict) -> Dict:
         """分析内容"""
+        return self.resolve_analysis(item, self.local_analyses([item])[0])
+    
+    def analyze_batch(self, items: List[Dict]) -> List[Dict]:
+        """批量分析内容（本地向量化分析，不确定项再交给DeepSeek）"""
+        
+        local_results = self.local_analyses(items)
+        return [self.resolve_analysis(item, local) for item, local in zip(items, local_results)]
+    
+    def resolve_analysis(self, item: Dict, local_analysis: Optional[Dict]) -> Dict:
+        """本地结论确定时直接采用，否则升级到DeepSeek分析"""
+        
+        # 本地结论确定，或DeepSeek熔断中，都直接使用本地结论
+        if local_analysis and (not local_analysis["uncertain"] or not self.llm_available()):
+            self.count("local_analyses")
+            return local_analysis
+        
+        analysis = self.llm_analyze_content(item)
+        
+        # DeepSeek分析失败时退回本地结论
+        if "error" in analysis and local_analysis:
+            self.count("local_analyses")
+            return local_analysis
+        
+        return analysis
+    
+    def llm_available(self) -> bool:
+        """DeepSeek是否可用（熔断打开时返回False）"""
+        is_available = getattr(self.deepseek, "is_available", None)
+        return is_available() if is_available else True
+    
+    def llm_analyze_content(self, item: Dict) -> Dict:
+        """使用DeepSeek分析内容"""
+        
+        self.count("llm_analyses")
         
         # 使用DeepSeek分析
         analysis = self.deepseek.analyze_content(item["content"])
         
         # 本地补充分析
         if "error" not in analysis:
-            # 计算本地特征
-            content_text = item["content"]
-            
-            # 检查emoji密度
-            emoji_pattern = re.compile(
-                "["
-                "\U0001F600-\U0001F64F"  # 表情符号
-                "\U0001F300-\U0001F5FF"  # 符号和象形文字
-                "\U0001F680-\U0001F6FF"  # 交通和地图符号
-                "\U0001F1E0-\U0001F1FF"  # 国旗
-                "]+", 
-                flags=re.UNICODE
-            )
-            emoji_count = len(emoji_pattern.findall(content_text))
-            emoji_density = emoji_count / max(1, len(content_text))
-            
-            analysis["emoji_density"] = emoji_density
-            
-            # 检查标题党特征
-            title = item.get("title", "")
-            clickbait_patterns = [
-                r"震惊", r"惊呆", r"吓尿", r"重磅", r"突发", 
-                r"速看", r"竟然", r"原来", r"真相", r"秘密"
-            ]
-            
-            clickbait_score = 0
-            for pattern in clickbait_patterns:
-                if re.search(pattern, title):
-                    clickbait_score += 0.1
-            
-            analysis["clickbait_score"] = min(1.0, clickbait_score)
+            # 计算本地特征（预编译正则，单次扫描）
+            analysis["emoji_density"] = emoji_density(item["content"])
+            analysis["clickbait_score"] = clickbait_score(item.get("title", ""))
             
             # 决定处理方式
             if analysis.get("sentiment_score", 0) < -0.3:
@@ -157,15 +357,14 @@ class ContentProcessor:
         
         # 检查缓存
         content_hash = self.hash_content(item["content"])
-        cache_file = f"{self.cache_dir}/rewrite_{content_hash}.json"
+        if self.rewrite_cache:
+            cached = self.rewrite_cache.get(content_hash)
+            if cached:
+                return cached
         
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached = json.load(f)
-                # 检查缓存是否过期（24小时）
-                cache_time = datetime.fromisoformat(cached["timestamp"])
-                if datetime.now() - cache_time < timedelta(hours=24):
-                    return cached["content"]
+        # DeepSeek熔断中，跳过重写
+        if not self.llm_available():
+            return None
         
         # 构建重写要求
         style_requirements = {
@@ -179,17 +378,9 @@ class ContentProcessor:
         # 调用DeepSeek重写
         rewritten = self.deepseek.rewrite_content(item["content"], style_requirements)
         
-        if rewritten:
+        if rewritten and self.rewrite_cache:
             # 缓存结果
-            os.makedirs(self.cache_dir, exist_ok=True)
-            cache_data = {
-                "original_hash": content_hash,
-                "content": rewritten,
-                "timestamp": datetime.now().isoformat(),
-                "original_analysis": analysis
-            }
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            self.rewrite_cache.put(content_hash, rewritten)
         
         return rewritten
     
@@ -198,19 +389,11 @@ class ContentProcessor:
         
         content = item["content"]
         
-        # 爱国关键词增强
-        patriotic_patterns = {
-            "中国": ["伟大的中国", "繁荣昌盛的中国"],
-            "发展": ["蓬勃发展", "高质量发展"],
-            "成就": ["辉煌成就", "举世瞩目的成就"],
-            "技术": ["自主创新技术", "领先技术"],
-            "突破": ["重大突破", "历史性突破"]
-        }
-        
-        for pattern, replacements in patriotic_patterns.items():
-            if pattern in content:
+        # 爱国关键词增强（一次扫描找出所有命中，按固定顺序替换）
+        found = PATRIOTIC_MATCHER.find_all(content)
+        for pattern, replacements in PATRIOTIC_PATTERNS.items():
+            if pattern in found:
                 # 随机选择一个增强词（简单实现）
-                import random
                 enhanced = random.choice(replacements)
                 # 替换第一个出现的位置
                 content = content.replace(pattern, enhanced, 1)
@@ -221,41 +404,36 @@ class ContentProcessor:
         item["tags"] = item.get("tags", [])
         
         # 根据内容添加标签
-        if "科技" in content or "技术" in content:
-            item["tags"].append("科技")
-        if "中国" in content or "国家" in content:
-            item["tags"].append("爱国")
-        if "突破" in content or "成就" in content:
-            item["tags"].append("成就")
+        tags = TAG_MATCHER.find_labels(content)
+        for tag in ("科技", "爱国", "成就"):
+            if tag in tags:
+                item["tags"].append(tag)
         
         return item
     
     def calculate_quality_score(self, item: Dict, analysis: Dict) -> float:
         """计算内容质量分数"""
-        
-        scores = {
-            "爱国程度": analysis.get("patriotic_level", 0.5) * 0.3,
-            "科技相关性": analysis.get("tech_relevance", 0.5) * 0.25,
-            "正式程度": analysis.get("formality", 0.5) * 0.2,
-            "情感正向": max(0, analysis.get("sentiment_score", 0)) * 0.15,
-            "标题党惩罚": (1 - analysis.get("clickbait_score", 0)) * 0.1
-        }
-        
-        total_score = sum(scores.values())
-        
-        # 重写内容加分
-        if item.get("was_rewritten"):
-            total_score = min(1.0, total_score * 1.1)
-        
-        return total_score
+        return float(self.calculate_quality_scores([item], [analysis])[0])
+    
+    def calculate_quality_scores(self, items: List[Dict], analyses: List[Dict]) -> np.ndarray:
+        """批量计算内容质量分数（特征矩阵 × 权重向量）"""
+        return quality_scores(analyses, [bool(item.get("was_rewritten")) for item in items])
     
     def hash_content(self, text: str) -> str:
         """生成内容哈希"""
         return hashlib.md5(text.encode('utf-8')).hexdigest()
     
     def get_stats(self) -> Dict:
-        """获取处理统计"""
-        return self.stats.copy()
+        """获取处理统计（含批处理各阶段耗时）"""
+        with self.stats_lock:
+            stats = self.stats.copy()
+        stats["batches"] = self.batches
+        stats["stage_seconds"] = {stage: round(seconds, 4) for stage, seconds in self.stage_seconds.items()}
+        if self.rewrite_cache:
+            stats["rewrite_cache"] = self.rewrite_cache.get_stats()
+        if self.feature_store:
+            stats["feature_store"] = self.feature_store.get_stats()
+        return stats
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# 截止时间传递与对冲请求
+
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """端到端截止时间
+
+    由工作流入口创建，经上下文变量传递到每次LLM调用，
+    剩余时间用于收紧单次调用的超时。
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """剩余秒数"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """是否已超时"""
+        return self.remaining() <= 0
+
+    def clamp(self, timeout: float) -> float:
+        """把单次调用超时收紧到剩余时间以内"""
+        return min(timeout, self.remaining())
+
+
+def current_deadline() -> Optional[Deadline]:
+    """当前上下文的截止时间（未设置时为None）"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """在with块内设置截止时间"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def bind_deadline(fn: Callable) -> Callable:
+    """绑定当前截止时间，供线程池中的任务使用（线程池不会继承上下文变量）"""
+    deadline = current_deadline()
+
+    def wrapper(*args, **kwargs):
+        with deadline_scope(deadline):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+class LatencyTracker:
+    """最近若干次调用的延迟分位数"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """延迟分位数；样本不足时返回None"""
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+
+def hedged_call(executor: Executor, fn: Callable, hedge_after: float) -> Tuple[object, Optional[str]]:
+    """对冲请求：首个请求超过hedge_after秒未返回时再发一个，取先成功的结果
+
+    返回(结果, 胜出方)，胜出方为None（未发对冲请求）、"primary"或"hedge"；
+    两个请求都失败时抛出先完成请求的异常。
+    """
+    primary = executor.submit(fn)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result(), None
+
+    secondary = executor.submit(fn)
+    pending = {primary, secondary}
+    first_error = None
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), "primary" if future is primary else "hedge"
+            first_error = first_error or future.exception()
+
+    raise first_error
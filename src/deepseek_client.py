@@ -4,26 +4,122 @@
 import os
 import json
 import time
+import re
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
-import requests
 from datetime import datetime
 
+from .llm_backend import LLMBackend, LLMBackendError, OpenAICompatibleBackend, create_backend
+from .prompt_templates import PROMPTS
+from .chunked_translator import ChunkedTranslator
+from .translation_memory import TranslationMemory
+from .circuit_breaker import CircuitBreaker, backoff_delay, get_breaker
+from .deadline import LatencyTracker, current_deadline, hedged_call
+
+SEGMENT_LINE = re.compile(r"^\s*\[(\d+)\]\s*(.*?)\s*$")
+
 class DeepSeekClient:
     """DeepSeek API客户端"""
     
-    def __init__(self, api_key: str = None, base_url: str = "https://api.deepseek.com"):
+    def __init__(self, 
+                 api_key: str = None, 
+                 base_url: str = "https://api.deepseek.com",
+                 model: str = "deepseek-chat",
+                 backend: LLMBackend = None,
+                 timeout: float = 30,
+                 min_call_timeout: float = 1.0,
+                 prompt_mode: str = "full",
+                 translation_config: Dict = None,
+                 breaker_config: Dict = None,
+                 hedge_config: Dict = None):
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
-        if not self.api_key:
-            raise ValueError("DeepSeek API密钥未设置")
-            
-        self.base_url = base_url
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
+        
+        if backend is None:
+            if not self.api_key:
+                raise ValueError("DeepSeek API密钥未设置")
+            backend = OpenAICompatibleBackend(base_url, self.api_key, model=model)
+        
+        self.backend = backend
+        self.base_url = getattr(backend, "base_url", base_url)
+        self.timeout = timeout
+        self.min_call_timeout = min_call_timeout
         self.request_count = 0
         self.total_tokens = 0
+        self.fast_failures = 0
+        self.deadline_skips = 0
+        
+        # 熔断器：同一服务地址的所有客户端共享；进程内后端单独使用
+        breaker_config = dict(breaker_config or {})
+        self.backoff_base = breaker_config.pop("backoff_base", 0.5)
+        self.backoff_cap = breaker_config.pop("backoff_cap", 8.0)
+        self.max_retry_after = breaker_config.pop("max_retry_after", 30.0)
+        if getattr(backend, "base_url", None):
+            self.breaker = get_breaker(f"llm:{backend.base_url}", **breaker_config)
+        else:
+            self.breaker = CircuitBreaker(f"llm:{backend.name}", **breaker_config)
+        
+        # 对冲请求：调用超过近期延迟分位数仍未返回时再发一个，取先返回的结果
+        hedge_config = hedge_config or {}
+        self.hedging_enabled = hedge_config.get("enabled", False)
+        self.hedge_percentile = hedge_config.get("percentile", 95)
+        self.latency = LatencyTracker(min_samples=hedge_config.get("min_samples", 20))
+        self.hedge_executor = ThreadPoolExecutor(
+            max_workers=hedge_config.get("max_workers", 8), 
+            thread_name_prefix="llm-hedge"
+        ) if self.hedging_enabled else None
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        
+        # 提示词模式：full（完整模板）/ compact（紧凑模板，节省输入token）
+        self.prompt_mode = prompt_mode
+        self.input_tokens_saved = 0
+        self.prompt_cache_hit_tokens = 0
+        self.prompt_cache_miss_tokens = 0
+        self.template_usage = {}
+        self.style_requirements_cache = {}
+        
+        # 并发调用时统计需要加锁，最近一次usage按线程保存
+        self.stats_lock = threading.Lock()
+        self.local = threading.local()
+        
+        # 长文分块并行翻译（可选句子级翻译记忆）
+        translation_config = translation_config or {}
+        memory_path = translation_config.get("memory_path")
+        self.translation_memory = TranslationMemory(memory_path) if memory_path else None
+        self.translator = ChunkedTranslator(
+            self._translate_chunk,
+            max_chunk_tokens=translation_config.get("max_chunk_tokens", 800),
+            max_workers=translation_config.get("max_workers", 4),
+            segments_fn=self._translate_segments,
+            memory=self.translation_memory
+        )
+    
+    @property
+    def last_usage(self) -> Dict:
+        """当前线程最近一次调用的token用量"""
+        return getattr(self.local, "last_usage", {})
+    
+    @classmethod
+    def from_config(cls, deepseek_config: Dict, api_key: str = None) -> "DeepSeekClient":
+        """根据system_config.yaml的deepseek配置创建客户端"""
+        api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
+        backend = create_backend(deepseek_config, api_key)
+        return cls(
+            api_key, 
+            backend=backend, 
+            timeout=deepseek_config.get("timeout", 30),
+            min_call_timeout=deepseek_config.get("min_call_timeout", 1.0),
+            prompt_mode=deepseek_config.get("prompt_mode", "full"),
+            translation_config=deepseek_config.get("translation"),
+            breaker_config=deepseek_config.get("circuit_breaker"),
+            hedge_config=deepseek_config.get("hedging")
+        )
+    
+    def is_available(self) -> bool:
+        """API是否可用（熔断打开时下游应直接走本地降级方案）"""
+        return not self.breaker.is_open()
         
     def call_api(self, 
                  prompt: str, 
@@ -39,90 +135,149 @@ class DeepSeekClient:
             messages.append({"role": "system", "content": system_prompt})
         
         messages.append({"role": "user", "content": prompt})
+        self.local.last_usage = {}
         
-        payload = {
-            "model": "deepseek-chat",
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": False
-        }
+        deadline = current_deadline()
         
         for attempt in range(retry_count):
+            # 剩余时间不足时直接放弃，由调用方走本地降级方案
+            timeout = deadline.clamp(self.timeout) if deadline else self.timeout
+            if timeout < self.min_call_timeout:
+                with self.stats_lock:
+                    self.deadline_skips += 1
+                return None
+            
+            # 熔断打开时快速失败
+            if not self.breaker.allow_request():
+                with self.stats_lock:
+                    self.fast_failures += 1
+                return None
+            
             try:
-                response = requests.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30
-                )
-                response.raise_for_status()
+                result = self.send_request(messages, temperature, max_tokens, timeout)
                 
-                result = response.json()
-                self.request_count += 1
-                
-                # 记录token使用量
-                if "usage" in result:
-                    self.total_tokens += result["usage"]["total_tokens"]
+                # 记录token使用量（含服务端前缀缓存命中情况）
+                with self.stats_lock:
+                    self.request_count += 1
+                    if "usage" in result:
+                        usage = result["usage"]
+                        self.local.last_usage = usage
+                        self.total_tokens += usage["total_tokens"]
+                        self.prompt_cache_hit_tokens += usage.get("prompt_cache_hit_tokens", 0)
+                        self.prompt_cache_miss_tokens += usage.get("prompt_cache_miss_tokens", 0)
                 
+                self.breaker.record_success()
                 return result["choices"][0]["message"]["content"]
                 
-            except requests.exceptions.RequestException as e:
+            except LLMBackendError as e:
+                # 除限流和超时外的4xx是请求本身的问题，重试无意义，也不计入熔断
+                if e.status_code and 400 <= e.status_code < 500 and e.status_code not in (408, 429):
+                    print(f"DeepSeek API请求被拒绝: {e}")
+                    return None
+                
+                self.breaker.record_failure(e.retry_after)
+                
                 if attempt == retry_count - 1:
                     print(f"DeepSeek API调用失败（尝试{retry_count}次）: {e}")
                     return None
-                time.sleep(2 ** attempt)  # 指数退避
+                
+                # 优先遵循Retry-After，等待过久则放弃；否则带抖动的指数退避
+                if e.retry_after is not None:
+                    if e.retry_after > self.max_retry_after:
+                        print(f"DeepSeek API限流，需等待{e.retry_after:.0f}秒，放弃本次调用")
+                        return None
+                    delay = e.retry_after
+                else:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if deadline and delay >= deadline.remaining():
+                    return None
+                time.sleep(delay)
         
         return None
     
+    def send_request(self, messages: List[Dict], temperature: float, max_tokens: int, timeout: float) -> Dict:
+        """发送一次请求；启用对冲时慢请求会再发一份"""
+        
+        def request():
+            return self.backend.chat(messages, temperature=temperature, max_tokens=max_tokens, timeout=timeout)
+        
+        hedge_after = self.latency.percentile(self.hedge_percentile) if self.hedging_enabled else None
+        start = time.monotonic()
+        
+        if hedge_after is None or hedge_after >= timeout:
+            result = request()
+        else:
+            result, winner = hedged_call(self.hedge_executor, request, hedge_after)
+            if winner:
+                with self.stats_lock:
+                    self.hedged_requests += 1
+                    if winner == "hedge":
+                        self.hedge_wins += 1
+        
+        self.latency.record(time.monotonic() - start)
+        return result
+    
+    def call_template(self, 
+                      template_name: str, 
+                      temperature: float = 0.3, 
+                      max_tokens: int = 2000,
+                      **fields) -> Optional[str]:
+        """使用注册的提示词模板调用API"""
+        
+        template = PROMPTS.get(template_name)
+        compact = self.prompt_mode == "compact"
+        system_prompt, prompt = template.render(compact=compact, **fields)
+        
+        result = self.call_api(prompt, system_prompt, temperature=temperature, max_tokens=max_tokens)
+        
+        # 按模板记录实际输入token
+        with self.stats_lock:
+            usage = self.template_usage.setdefault(template_name, {"calls": 0, "prompt_tokens": 0})
+            usage["calls"] += 1
+            usage["prompt_tokens"] += self.last_usage.get("prompt_tokens", 0)
+            
+            if compact:
+                self.input_tokens_saved += template.input_tokens_saved(**fields)
+        
+        return result
+    
     def translate_content(self, text: str, target_lang: str = "zh") -> str:
-        """翻译内容"""
-        system_prompt = "你是一个专业的翻译助手，擅长将各种语言的内容准确翻译成中文。"
-        prompt = f"请将以下内容翻译成{target_lang}，保持专业、准确的风格：\n\n{text}"
-        return self.call_api(prompt, system_prompt, temperature=0.1)
+        """翻译内容（长文按段落/句子分块并行翻译）"""
+        return self.translator.translate(text, target_lang)
     
-    def rewrite_content(self, text: str, style_requirements: Dict) -> str:
-        """重写内容为爱国键盘侠风格"""
-        system_prompt = """你是一个专业的内容编辑，擅长将各种风格的内容重写为符合爱国键盘侠偏好的风格。
+    def _translate_chunk(self, text: str, target_lang: str, max_tokens: int) -> Optional[str]:
+        """翻译单个文本块"""
+        return self.call_template("translate", temperature=0.1, max_tokens=max_tokens, 
+                                  text=text, target_lang=target_lang)
+    
+    def _translate_segments(self, sentences: List[str], target_lang: str, max_tokens: int) -> Optional[List[str]]:
+        """逐句翻译一批句子，按编号对齐；结果不完整时返回None"""
         
-        重写要求：
-        1. 语言风格：理性冷静、用词精准、逻辑清晰
-        2. 情感处理：增强爱国情怀，转为积极正面表达
-        3. 结构优化：确保段落分明，重点突出
-        4. 语气调整：避免轻佻、夸张、网络流行语
-        5. 信息保留：保留所有核心事实和信息点
-        6. 爱国增强：适当添加爱国情感和民族自豪感"""
+        segments = "\n".join(f"[{i}] {sentence}" for i, sentence in enumerate(sentences, 1))
+        result = self.call_template("translate_segments", temperature=0.1, max_tokens=max_tokens,
+                                    segments=segments, target_lang=target_lang)
+        if not result:
+            return None
         
-        requirements = self._format_style_requirements(style_requirements)
-        prompt = f"""{requirements}
-
-请重写以下内容：
-{text}
-
-重写后的内容："""
+        translated = {}
+        for line in result.splitlines():
+            match = SEGMENT_LINE.match(line)
+            if match and match.group(2):
+                translated[int(match.group(1))] = match.group(2)
+        
+        if len(translated) != len(sentences) or any(i not in translated for i in range(1, len(sentences) + 1)):
+            return None
         
-        return self.call_api(prompt, system_prompt, temperature=0.4)
+        return [translated[i] for i in range(1, len(sentences) + 1)]
+    
+    def rewrite_content(self, text: str, style_requirements: Dict) -> str:
+        """重写内容为爱国键盘侠风格"""
+        requirements = self._format_style_requirements(style_requirements)
+        return self.call_template("rewrite", temperature=0.4, text=text, style_requirements=requirements)
     
     def analyze_content(self, text: str) -> Dict:
         """分析内容情感和风格"""
-        system_prompt = """你是一个内容分析专家，擅长分析文本的情感倾向、风格特征和主题内容。
-        请以JSON格式返回分析结果。"""
-        
-        prompt = f"""分析以下内容：
-
-{text}
-
-请以JSON格式返回分析结果，包含以下字段：
-- sentiment_score: 情感分数（-1到1，负数为负面）
-- patriotic_level: 爱国程度（0-1）
-- tech_relevance: 科技相关性（0-1）
-- formality: 正式程度（0-1）
-- sensationalism: 煽情程度（0-1）
-- clickbait_score: 标题党程度（0-1）
-- main_topics: 主要话题列表
-- recommended_action: 建议处理方式（keep/rewrite/filter）"""
-        
-        result = self.call_api(prompt, system_prompt, temperature=0.1)
+        result = self.call_template("analyze", temperature=0.1, text=text)
         try:
             return json.loads(result)
         except:
@@ -130,8 +285,6 @@ class DeepSeekClient:
     
     def generate_briefing(self, content_items: List[Dict], briefing_type: str) -> str:
         """生成简报"""
-        system_prompt = """你是一个专业的简报编辑，擅长将多个内容项组织成结构清晰、阅读流畅的简报。
-        简报风格：积极正面、信息丰富、鼓舞人心。"""
         
         items_text = ""
         for i, item in enumerate(content_items, 1):
@@ -141,34 +294,37 @@ class DeepSeekClient:
                 items_text += f"   链接：{item['url']}\n"
             items_text += "\n"
         
-        prompt = f"""请根据以下内容项生成{briefing_type}简报：
-
-{items_text}
-
-简报要求：
-1. 开头：吸引人的标题和简短引言
-2. 主体：清晰列出每个内容项，突出亮点
-3. 结尾：总结和积极展望
-4. 风格：符合爱国键盘侠偏好，积极正面
-5. 格式：使用适当的emoji和分段
-
-请输出完整的简报内容："""
-        
-        return self.call_api(prompt, system_prompt, temperature=0.3)
+        return self.call_template("briefing", temperature=0.3, items_text=items_text, briefing_type=briefing_type)
     
     def _format_style_requirements(self, requirements: Dict) -> str:
-        """格式化风格要求"""
-        req_text = "风格要求：\n"
-        for key, value in requirements.items():
-            req_text += f"- {key}: {value}\n"
-        return req_text
+        """格式化风格要求（相同要求只渲染一次）"""
+        cache_key = tuple(requirements.items())
+        if cache_key not in self.style_requirements_cache:
+            req_text = "风格要求：\n"
+            for key, value in requirements.items():
+                req_text += f"- {key}: {value}\n"
+            self.style_requirements_cache[cache_key] = req_text
+        return self.style_requirements_cache[cache_key]
     
     def get_usage_stats(self) -> Dict:
         """获取使用统计"""
         return {
             "request_count": self.request_count,
+            "fast_failures": self.fast_failures,
+            "deadline_skips": self.deadline_skips,
+            "hedged_requests": self.hedged_requests,
+            "hedge_wins": self.hedge_wins,
+            "latency_p95": self.latency.percentile(95),
+            "circuit_breaker": self.breaker.get_stats(),
             "total_tokens": self.total_tokens,
-            "estimated_cost": self.total_tokens * 0.000002  # 估算成本
+            "estimated_cost": self.total_tokens * 0.000002,  # 估算成本
+            "prompt_mode": self.prompt_mode,
+            "input_tokens_saved": self.input_tokens_saved,
+            "prompt_cache_hit_tokens": self.prompt_cache_hit_tokens,
+            "prompt_cache_miss_tokens": self.prompt_cache_miss_tokens,
+            "template_usage": {name: usage.copy() for name, usage in self.template_usage.items()},
+            "translation": self.translator.get_stats(),
+            "translation_memory": self.translation_memory.get_stats() if self.translation_memory else None
         }
 
 
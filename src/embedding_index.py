@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# 本地文本向量与话题原型索引
+
+import re
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[\u4e00-\u9fff]+|[a-z0-9]+")
+
+
+def content_key(item: Dict) -> str:
+    """文章内容键（标题+正文的哈希），采集时计算一次，重写后保持不变"""
+    text = f"{item.get('title', '')}\n{item.get('content', '')}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def tokenize(text: str) -> List[str]:
+    """分词：中文按字二元组，英文和数字按词"""
+    tokens = []
+    for run in TOKEN_PATTERN.findall(text.lower()):
+        if run[0].isascii():
+            tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class HashedTfidfEmbedder:
+    """哈希TF-IDF向量
+
+    词项经crc32哈希到固定维度（带符号，减少碰撞偏差），词频取对数。
+    文档频率随入库文章累计，IDF在查询时才乘上，
+    因此先后入库的文章和话题原型始终使用同一套IDF。
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.document_frequency = np.zeros(dim, dtype=np.float64)
+        self.documents = 0
+
+    def term_vector(self, text: str) -> np.ndarray:
+        """对数词频向量（未乘IDF）"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode('utf-8'))
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return np.sign(vector) * np.log1p(np.abs(vector))
+
+    def observe(self, term_vector: np.ndarray):
+        """累计文档频率"""
+        self.document_frequency += term_vector != 0
+        self.documents += 1
+
+    def idf(self) -> np.ndarray:
+        """平滑IDF"""
+        return np.log((1.0 + self.documents) / (1.0 + self.document_frequency)) + 1.0
+
+    def weight(self, term_vectors: np.ndarray) -> np.ndarray:
+        """乘IDF并做L2归一化"""
+        weighted = term_vectors * self.idf()
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        return np.divide(weighted, norms, out=np.zeros_like(weighted), where=norms > 0)
+
+
+class ContentEmbeddingIndex:
+    """文章向量索引 + 话题原型
+
+    文章在采集时按内容键向量化一次（进程内LRU保存），
+    每批候选与所有话题原型的相似度用一次矩阵乘法得到。
+    话题原型只有十几个，直接精确计算即可，无需近似最近邻结构。
+    """
+
+    def __init__(self, dim: int = 1024, max_entries: int = 5000):
+        self.embedder = HashedTfidfEmbedder(dim)
+        self.max_entries = max_entries
+        self.vectors = OrderedDict()  # content_key -> 对数词频向量
+        self.lock = threading.Lock()
+
+        self.topics: List[str] = []
+        self.prototype_vectors = np.zeros((0, dim), dtype=np.float32)
+
+    def add_items(self, items: List[Dict]) -> int:
+        """文章入库（已入库的跳过），返回新入库数量"""
+        added = 0
+        for item in items:
+            key = item.setdefault("content_key", content_key(item))
+            with self.lock:
+                if key in self.vectors:
+                    self.vectors.move_to_end(key)
+                    continue
+            vector = self.embedder.term_vector(f"{item.get('title', '')} {item.get('content', '')}")
+            with self.lock:
+                self.vectors[key] = vector
+                self.embedder.observe(vector)
+                while len(self.vectors) > self.max_entries:
+                    self.vectors.popitem(last=False)
+            added += 1
+        return added
+
+    def set_prototypes(self, prototypes: Dict[str, str]):
+        """设置话题原型 {话题: 描述文本}"""
+        self.topics = list(prototypes)
+        if self.topics:
+            self.prototype_vectors = np.stack([
+                self.embedder.term_vector(f"{topic} {text}") for topic, text in prototypes.items()
+            ])
+        else:
+            self.prototype_vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+
+    def embeddings(self, items: List[Dict]) -> np.ndarray:
+        """候选文章的归一化向量（N × dim），未入库的先入库"""
+        self.add_items(items)
+        rows = []
+        for item in items:
+            with self.lock:
+                vector = self.vectors.get(item["content_key"])
+            if vector is None:
+                # 批次大于索引容量时，已被淘汰的直接重新计算
+                vector = self.embedder.term_vector(f"{item.get('title', '')} {item.get('content', '')}")
+            rows.append(vector)
+        return self.embedder.weight(np.stack(rows))
+
+    def topic_similarity(self, items: List[Dict]) -> np.ndarray:
+        """候选文章与各话题原型的余弦相似度（N × 话题数）"""
+        if not items or not self.topics:
+            return np.zeros((len(items), len(self.topics)))
+        return self.embeddings(items) @ self.embedder.weight(self.prototype_vectors).T
+
+    def nearest_topics(self, items: List[Dict]) -> List[Optional[str]]:
+        """每篇文章最接近的话题（与所有原型都不相似时为None）"""
+        similarity = self.topic_similarity(items)
+        if similarity.shape[1] == 0:
+            return [None] * len(items)
+        best = similarity.argmax(axis=1)
+        return [self.topics[b] if similarity[i, b] > 0 else None for i, b in enumerate(best)]
+
+    def get_stats(self) -> Dict:
+        """获取索引统计"""
+        with self.lock:
+            return {
+                "entries": len(self.vectors),
+                "documents_observed": self.embedder.documents,
+                "topics": len(self.topics)
+            }
@@ -11,7 +11,7 @@ import hashlib
 class FeedbackSystem:
     """用户反馈系统"""
     
-    def __init__(self, user_id: str, data_dir: str = "./data"):
+    def __init__(self, user_id: str, data_dir: str = "./data", profile_service=None):
         self.user_id = user_id
         self.data_dir = data_dir
         self.feedback_file = f"{data_dir}/feedback.json"
@@ -21,6 +21,9 @@ class FeedbackSystem:
         self.feedback_data = self.load_feedback_data()
         self.user_model = self.load_user_model()
         
+        # 共享画像服务：保存学习模型后发布新版本，推荐引擎即时生效
+        self.profile_service = profile_service
+        
     def load_feedback_data(self) -> Dict:
         """加载反馈数据"""
         if os.path.exists(self.feedback_file):
@@ -109,6 +112,8 @@ class FeedbackSystem:
         # 保存数据
         self.save_feedback_data()
         self.save_user_model()
+        if self.profile_service:
+            self.profile_service.publish_model(self.user_model)
         
         return feedback_entry
     
@@ -222,7 +227,7 @@ class FeedbackSystem:
         day_of_week = feedback["context"]["day_of_week"]
         reaction = feedback["reaction"]
         
-        time_key = f"{day_of_day}_{time_of_day}"
+        time_key = f"{day_of_week}_{time_of_day}"
         if reaction == "like":
             patterns.setdefault("preferred_times", {}).setdefault(time_key, 0)
             patterns["preferred_times"][time_key] += 1
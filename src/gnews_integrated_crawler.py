@@ -12,6 +12,10 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Set
 import yaml
 
+from .deepseek_client import DeepSeekClient
+from .circuit_breaker import get_breaker
+from .llm_backend import parse_retry_after
+
 class GNewsIntegratedCrawler:
     """集成gnews.io的新闻爬取系统"""
     
@@ -25,11 +29,15 @@ class GNewsIntegratedCrawler:
         # DeepSeek API配置
         self.deepseek_api_key = os.getenv("DEEPSEEK_API_KEY", "")
         self.deepseek_base_url = "https://api.deepseek.com"
+        self.deepseek = DeepSeekClient(self.deepseek_api_key, self.deepseek_base_url) if self.deepseek_api_key else None
         
         # 请求计数器（控制API使用）
         self.request_count = 0
         self.max_daily_requests = 60  # 安全限制
         
+        # gnews.io熔断器（进程内共享）
+        self.gnews_breaker = get_breaker("gnews", failure_threshold=3, recovery_timeout=300)
+        
         # 去重集合
         self.seen_articles = set()
         
@@ -74,6 +82,11 @@ class GNewsIntegratedCrawler:
         if not self.check_api_limit():
             return {'articles': []}
         
+        # 熔断中直接返回空结果，不消耗请求额度
+        if not self.gnews_breaker.allow_request():
+            print(f"   ⚠️  gnews.io熔断中，{self.gnews_breaker.retry_in():.0f}秒后重试")
+            return {'articles': []}
+        
         params['token'] = self.gnews_api_key
         params['max'] = 10  # 每次最多10篇
         
@@ -88,13 +101,17 @@ class GNewsIntegratedCrawler:
             )
             
             if response.status_code == 200:
+                self.gnews_breaker.record_success()
                 return response.json()
             else:
                 print(f"   ❌ gnews.io API失败: HTTP {response.status_code}")
+                if response.status_code == 429 or response.status_code >= 500:
+                    self.gnews_breaker.record_failure(parse_retry_after(response.headers.get("Retry-After")))
                 return {'articles': []}
                 
         except Exception as e:
             print(f"   ❌ API调用异常: {type(e).__name__}")
+            self.gnews_breaker.record_failure()
             return {'articles': []}
     
     def translate_with_deepseek(self, text: str, source_lang: str = "en") -> str:
@@ -102,28 +119,15 @@ class GNewsIntegratedCrawler:
         if not text or len(text.strip()) < 10:
             return text
         
-        # 简化处理，实际应该调用DeepSeek API
-        # 这里模拟翻译过程
         print(f"     翻译 {len(text)} 字符内容...")
         
-        # 模拟翻译结果
-        # 实际使用时应该调用DeepSeek API:
-        # response = requests.post(
-        #     f"{self.deepseek_base_url}/chat/completions",
-        #     headers={"Authorization": f"Bearer {self.deepseek_api_key}"},
-        #     json={
-        #         "model": "deepseek-chat",
-        #         "messages": [
-        #             {"role": "system", "content": "你是一个专业的翻译助手，将外文新闻准确翻译成中文，保持原文意思不变。"},
-        #             {"role": "user", "content": f"请将以下{source_lang}文内容翻译成中文：\n\n{text}"}
-        #         ],
-        #         "temperature": 0.3
-        #         }
-        # )
-        
-        # 模拟翻译
-        if len(text) > 300:
-            return f"[DeepSeek翻译] {text[:300]}..."
+        # 长文按段落/句子分块并行翻译，不再截断
+        if self.deepseek:
+            translated = self.deepseek.translate_content(text, target_lang="中文")
+            if translated:
+                return translated
+        
+        # 未配置API密钥或翻译失败时保留原文
         return f"[DeepSeek翻译] {text}"
     
     def get_gnews_headlines(self, category: str = "general", lang: str = "en", country: str = "us") -> List[Dict]:
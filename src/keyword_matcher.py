@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# Aho-Corasick关键词自动机
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+
+class KeywordAutomaton:
+    """Aho-Corasick多模式匹配自动机
+
+    一次扫描文本即可找出所有关键词命中，耗时与文本长度和命中数相关，
+    与关键词数量无关。关键词可以带标签（如词典名、标签名），按标签统计命中；
+    同一关键词可以属于多个标签。
+    """
+
+    def __init__(self, keywords: Union[Iterable[str], Dict[str, Tuple[str, ...]]]):
+        """
+        Args:
+            keywords: 关键词列表，或 {关键词: 标签元组} 字典（列表时标签即关键词本身）
+        """
+        if isinstance(keywords, dict):
+            labels = dict(keywords)
+        else:
+            labels = {keyword: (keyword,) for keyword in keywords}
+
+        # 空关键词会在每个位置命中，直接忽略
+        self.labels = {keyword: label for keyword, label in labels.items() if keyword}
+        self.keywords = list(self.labels)
+
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[str]] = [[]]
+        self.build()
+
+    def build(self):
+        """构建trie和失败指针"""
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append(keyword)
+
+        # 广度优先计算失败指针，并把失败状态的输出并入当前状态
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """逐个产出命中 (结束位置, 关键词)，包括相互重叠的命中"""
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        state = 0
+
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in outputs[state]:
+                yield index, keyword
+
+    def find_all(self, text: str) -> Set[str]:
+        """命中的关键词集合"""
+        return {keyword for _, keyword in self.iter_matches(text)}
+
+    def first(self, text: str) -> Optional[str]:
+        """最先出现的命中关键词，没有命中时返回None"""
+        for _, keyword in self.iter_matches(text):
+            return keyword
+        return None
+
+    def contains_any(self, text: str) -> bool:
+        """是否命中任意关键词"""
+        return self.first(text) is not None
+
+    def count_labels(self, text: str) -> Dict[str, int]:
+        """按标签统计命中次数"""
+        counts = {}
+        for _, keyword in self.iter_matches(text):
+            for label in self.labels[keyword]:
+                counts[label] = counts.get(label, 0) + 1
+        return counts
+
+    def find_labels(self, text: str) -> Set[str]:
+        """命中的标签集合"""
+        found = set()
+        for _, keyword in self.iter_matches(text):
+            found.update(self.labels[keyword])
+        return found
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+def labelled_automaton(groups: Dict[str, Iterable[str]]) -> KeywordAutomaton:
+    """由 {标签: 关键词列表} 构建自动机"""
+    labels = {}
+    for label, keywords in groups.items():
+        for keyword in keywords:
+            if label not in labels.setdefault(keyword, ()):
+                labels[keyword] += (label,)
+    return KeywordAutomaton(labels)
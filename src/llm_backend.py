@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# LLM后端接口
+
+import re
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+CJK_PATTERN = re.compile(r"[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """估算token数（DeepSeek经验值：中文约0.6 token/字，英文约0.3 token/字符）"""
+    if not text:
+        return 0
+    cjk_count = len(CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return max(1, int(round(cjk_count * 0.6 + other_count * 0.3)))
+
+
+class LLMBackendError(Exception):
+    """LLM后端调用失败"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMBackend:
+    """LLM后端接口
+
+    chat()接收OpenAI格式的messages，返回OpenAI兼容的响应字典
+    （包含choices和usage），失败时抛出LLMBackendError。
+    """
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def chat(self,
+             messages: List[Dict],
+             temperature: float = 0.3,
+             max_tokens: int = 2000,
+             timeout: float = 30) -> Dict:
+        raise NotImplementedError
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """OpenAI兼容的HTTP后端（DeepSeek官方API或本地替身服务）"""
+
+    name = "openai_compatible"
+
+    def __init__(self, base_url: str, api_key: str, model: str = "deepseek-chat"):
+        super().__init__(model)
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+        self.session = requests.Session()
+
+    def chat(self,
+             messages: List[Dict],
+             temperature: float = 0.3,
+             max_tokens: int = 2000,
+             timeout: float = 30) -> Dict:
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": False
+        }
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/chat/completions",
+                headers=self.headers,
+                json=payload,
+                timeout=timeout
+            )
+        except requests.exceptions.RequestException as e:
+            raise LLMBackendError(str(e)) from e
+
+        if response.status_code >= 400:
+            raise LLMBackendError(
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+
+        try:
+            return response.json()
+        except ValueError as e:
+            raise LLMBackendError(f"响应解析失败: {e}", status_code=response.status_code) from e
+
+
+class StandInBackend(LLMBackend):
+    """进程内替身后端，复用本地替身服务的延迟、限流和token模型"""
+
+    name = "stand_in"
+
+    def __init__(self, model: str = "deepseek-chat", simulator=None, **simulator_options):
+        super().__init__(model)
+        if simulator is None:
+            from .local_llm_server import StandInSimulator
+            simulator = StandInSimulator(**simulator_options)
+        self.simulator = simulator
+
+    def chat(self,
+             messages: List[Dict],
+             temperature: float = 0.3,
+             max_tokens: int = 2000,
+             timeout: float = 30) -> Dict:
+        status, headers, body = self.simulator.handle({
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })
+
+        if status >= 400:
+            raise LLMBackendError(
+                f"HTTP {status}: {body.get('error', {}).get('message', '')}",
+                status_code=status,
+                retry_after=parse_retry_after(headers.get("Retry-After"))
+            )
+
+        return body
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After头（秒数或HTTP日期）"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def create_backend(deepseek_config: Dict, api_key: Optional[str] = None) -> LLMBackend:
+    """根据system_config.yaml中的deepseek配置创建后端"""
+
+    provider = deepseek_config.get("provider", "deepseek")
+    model = deepseek_config.get("model", "deepseek-chat")
+
+    if provider == "stand_in":
+        return StandInBackend(model=model, **deepseek_config.get("stand_in", {}))
+
+    if not api_key:
+        raise ValueError("DeepSeek API密钥未设置")
+
+    return OpenAICompatibleBackend(
+        deepseek_config.get("base_url", "https://api.deepseek.com"),
+        api_key,
+        model=model
+    )
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# 本地启发式内容分析器
+
+from typing import Dict, List
+
+import numpy as np
+
+from .keyword_matcher import labelled_automaton
+from .text_patterns import clickbait_score, emoji_count
+
+# 情感词典
+POSITIVE_WORDS = [
+    "成就", "突破", "领先", "成功", "繁荣", "进步", "创新", "增长", "胜利",
+    "自豪", "振奋", "辉煌", "喜讯", "提升", "首次", "里程碑",
+    "achievement", "breakthrough", "success", "growth", "progress",
+    "record", "innovation", "milestone"
+]
+NEGATIVE_WORDS = [
+    "失败", "下滑", "危机", "崩溃", "丑闻", "事故", "灾难", "冲突", "衰退",
+    "亏损", "裁员", "抗议", "担忧", "悲观", "暴跌", "恶化",
+    "crisis", "collapse", "scandal", "decline", "failure", "layoff",
+    "disaster", "recession"
+]
+
+# 主题关键词
+PATRIOTIC_WORDS = [
+    "中国", "我国", "国家", "祖国", "民族", "自主", "国产", "大国", "强国",
+    "一带一路", "复兴", "国之重器", "china", "chinese"
+]
+TECH_WORDS = [
+    "科技", "技术", "人工智能", "芯片", "量子", "航天", "5g", "算法", "半导体",
+    "研发", "technology", "chip", "quantum", "software", "robot"
+]
+
+# 正式程度特征
+FORMAL_WORDS = [
+    "据", "表示", "指出", "宣布", "发布", "报告", "研究", "数据显示", "近日",
+    "according", "announced", "reported", "study"
+]
+INFORMAL_WORDS = [
+    "哈哈", "卧槽", "绝了", "yyds", "破防", "emo", "笑死", "真的会谢",
+    "lol", "omg"
+]
+
+# 煽情特征
+SENSATIONAL_WORDS = [
+    "震惊", "惊呆", "吓尿", "疯传", "炸裂", "逆天", "史上最", "万万没想到",
+    "!!", "！！", "shocking", "unbelievable"
+]
+
+
+class LocalContentAnalyzer:
+    """本地内容分析器
+
+    用词典和正则批量计算情感、爱国程度、科技相关性、正式程度、
+    煽情程度和标题党分数，输出字段与DeepSeekClient.analyze_content一致。
+    只有决策落在阈值附近的内容才标记为需要LLM复核。
+    """
+
+    # 决策阈值（与ContentProcessor.analyze_content的规则一致）
+    FILTER_SENTIMENT = -0.3
+    REWRITE_CLICKBAIT = 0.5
+    REWRITE_SENSATIONALISM = 0.6
+
+    def __init__(self, uncertainty_margin: float = 0.1):
+        self.uncertainty_margin = uncertainty_margin
+        self.lexicons = {
+            "positive": POSITIVE_WORDS,
+            "negative": NEGATIVE_WORDS,
+            "patriotic": PATRIOTIC_WORDS,
+            "tech": TECH_WORDS,
+            "formal": FORMAL_WORDS,
+            "informal": INFORMAL_WORDS,
+            "sensational": SENSATIONAL_WORDS
+        }
+        # 所有词典合并成一个自动机，每条文本只扫描一次
+        self.lexicon_matcher = labelled_automaton(self.lexicons)
+
+    def analyze(self, item: Dict) -> Dict:
+        """分析单个内容项"""
+        return self.analyze_batch([item])[0]
+
+    def analyze_batch(self, items: List[Dict]) -> List[Dict]:
+        """批量分析内容项"""
+
+        if not items:
+            return []
+
+        texts = [f"{item.get('title', '')} {item.get('content', '')}".lower() for item in items]
+        titles = [item.get("title", "") for item in items]
+
+        # 词典命中计数（N × 词典数）
+        hits = [self.lexicon_matcher.count_labels(text) for text in texts]
+        counts = {
+            name: np.array([hit.get(name, 0) for hit in hits], dtype=float)
+            for name in self.lexicons
+        }
+
+        lengths = np.array([max(1, len(text)) for text in texts], dtype=float)
+        per_100_chars = lengths / 100.0
+
+        emoji_counts = np.array(
+            [emoji_count(item.get("content", "")) for item in items],
+            dtype=float
+        )
+        exclamations = np.array(
+            [text.count("!") + text.count("！") for text in texts],
+            dtype=float
+        )
+        clickbait = np.array([clickbait_score(title) for title in titles], dtype=float)
+
+        # 情感：正负词差值归一化到(-1, 1)
+        pos, neg = counts["positive"], counts["negative"]
+        sentiment = np.tanh((pos - neg) / np.sqrt(pos + neg + 1.0))
+
+        # 主题密度：每百字命中数经饱和函数映射到[0, 1)
+        patriotic = 1.0 - np.exp(-counts["patriotic"] / np.sqrt(per_100_chars + 1.0))
+        tech = 1.0 - np.exp(-counts["tech"] / np.sqrt(per_100_chars + 1.0))
+
+        # 正式程度：正式用语加分，口语、感叹号和emoji扣分
+        emoji_density = emoji_counts / lengths
+        informal_signal = counts["informal"] + 0.5 * exclamations + emoji_counts
+        formality = np.clip(
+            0.5 + 0.5 * np.tanh(0.5 * (counts["formal"] - informal_signal)),
+            0.0, 1.0
+        )
+
+        # 煽情程度
+        sensationalism = np.clip(
+            0.25 * counts["sensational"] + 0.05 * exclamations + 10.0 * emoji_density,
+            0.0, 1.0
+        )
+
+
+        # 决策与不确定性：距离决策阈值越近越不确定
+        actions = np.where(
+            sentiment < self.FILTER_SENTIMENT, "filter",
+            np.where(
+                (clickbait > self.REWRITE_CLICKBAIT) | (sensationalism > self.REWRITE_SENSATIONALISM),
+                "rewrite", "keep"
+            )
+        )
+        margins = np.minimum.reduce([
+            np.abs(sentiment - self.FILTER_SENTIMENT),
+            np.abs(clickbait - self.REWRITE_CLICKBAIT),
+            np.abs(sensationalism - self.REWRITE_SENSATIONALISM)
+        ])
+        uncertain = margins < self.uncertainty_margin
+        confidence = np.clip(margins / max(1e-6, 2 * self.uncertainty_margin), 0.0, 1.0)
+
+        results = []
+        for i in range(len(items)):
+            results.append({
+                "sentiment_score": round(float(sentiment[i]), 4),
+                "patriotic_level": round(float(patriotic[i]), 4),
+                "tech_relevance": round(float(tech[i]), 4),
+                "formality": round(float(formality[i]), 4),
+                "sensationalism": round(float(sensationalism[i]), 4),
+                "clickbait_score": round(float(clickbait[i]), 4),
+                "emoji_density": float(emoji_density[i]),
+                "main_topics": self.main_topics(counts["patriotic"][i], counts["tech"][i]),
+                "recommended_action": str(actions[i]),
+                "confidence": round(float(confidence[i]), 4),
+                "uncertain": bool(uncertain[i]),
+                "analyzer": "local"
+            })
+
+        return results
+
+    def main_topics(self, patriotic_hits: float, tech_hits: float) -> List[str]:
+        """根据命中情况给出主要话题"""
+        topics = []
+        if tech_hits > 0:
+            topics.append("科技")
+        if patriotic_hits > 0:
+            topics.append("爱国")
+        return topics
+
+
+if __name__ == "__main__":
+    # 测试代码
+    analyzer = LocalContentAnalyzer()
+
+    test_items = [
+        {"title": "中国科技取得新进展", "content": "近日，我国在人工智能领域取得重要突破，相关技术达到国际领先水平。"},
+        {"title": "震惊！竟然是这样，真相原来如此", "content": "万万没想到！！这个秘密让人惊呆了😱😱"},
+        {"title": "某公司陷入危机", "content": "受市场下滑影响，公司亏损扩大并宣布裁员，投资者担忧情绪蔓延。"}
+    ]
+
+    for item, result in zip(test_items, analyzer.analyze_batch(test_items)):
+        print(item["title"], "->", result["recommended_action"], result)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# 本地LLM替身服务（OpenAI兼容，用于离线测试和压测）
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from .llm_backend import estimate_tokens
+
+
+class StandInSimulator:
+    """LLM替身模拟器
+
+    模拟三件事：
+    - 延迟：基础延迟 + 每个输出token的生成耗时 + 高斯抖动
+    - 限流：令牌桶，超出速率返回429并附带Retry-After
+    - 用量：按estimate_tokens估算prompt/completion token
+    """
+
+    def __init__(self,
+                 latency_ms: float = 0,
+                 latency_jitter_ms: float = 0,
+                 per_token_ms: float = 0,
+                 rate_limit_rps: Optional[float] = None,
+                 rate_limit_burst: Optional[int] = None,
+                 error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.per_token_ms = per_token_ms
+        self.rate_limit_rps = rate_limit_rps
+        self.rate_limit_burst = rate_limit_burst or max(1, int(math.ceil(rate_limit_rps or 1)))
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.seen_prefixes = set()
+        self.bucket_tokens = float(self.rate_limit_burst)
+        self.bucket_updated = time.monotonic()
+        self.stats = {
+            "requests": 0,
+            "completed": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0
+        }
+
+    def handle(self, payload: Dict) -> Tuple[int, Dict, Dict]:
+        """处理一次chat/completions请求，返回(状态码, 响应头, 响应体)"""
+
+        with self.lock:
+            self.stats["requests"] += 1
+            retry_after = self.take_rate_token()
+            if retry_after is not None:
+                self.stats["rate_limited"] += 1
+                return 429, {"Retry-After": str(int(math.ceil(retry_after)))}, error_body(
+                    "Rate limit reached", "rate_limit_exceeded"
+                )
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats["server_errors"] += 1
+                return 500, {}, error_body("Simulated server error", "server_error")
+            jitter = self.random.gauss(0, self.latency_jitter_ms) if self.latency_jitter_ms else 0
+
+            # 前缀缓存：system消息出现过则视为命中
+            messages = payload.get("messages", [])
+            system_text = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+            prefix_hit = bool(system_text) and system_text in self.seen_prefixes
+            if system_text:
+                self.seen_prefixes.add(system_text)
+
+        content = self.respond(messages)
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = min(estimate_tokens(content), payload.get("max_tokens", 2000))
+        cache_hit_tokens = estimate_tokens(system_text) if prefix_hit else 0
+
+        delay_ms = max(0.0, self.latency_ms + self.per_token_ms * completion_tokens + jitter)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        with self.lock:
+            self.stats["completed"] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+
+        return 200, {}, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "deepseek-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_cache_hit_tokens": cache_hit_tokens,
+                "prompt_cache_miss_tokens": prompt_tokens - cache_hit_tokens
+            }
+        }
+
+    def take_rate_token(self) -> Optional[float]:
+        """从令牌桶取令牌；被限流时返回需要等待的秒数（调用方需持有锁）"""
+
+        if not self.rate_limit_rps:
+            return None
+
+        now = time.monotonic()
+        elapsed = now - self.bucket_updated
+        self.bucket_updated = now
+        self.bucket_tokens = min(self.rate_limit_burst, self.bucket_tokens + elapsed * self.rate_limit_rps)
+
+        if self.bucket_tokens >= 1:
+            self.bucket_tokens -= 1
+            return None
+
+        return (1 - self.bucket_tokens) / self.rate_limit_rps
+
+    def respond(self, messages: List[Dict]) -> str:
+        """根据提示词类型生成模拟响应"""
+
+        # 优先按system消息判断请求类型（模板把固定说明放在system中）
+        system_text = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        user_text = messages[-1].get("content", "") if messages else ""
+        prompt = system_text or user_text
+
+        if "排序" in user_text:
+            count = user_text.count("标题：")
+            return json.dumps(list(range(1, count + 1)))
+        elif "推荐分数" in user_text:
+            return "最终推荐分数：0.8分，内容与用户偏好基本匹配。"
+        elif "翻译" in prompt and "[编号]" in prompt:
+            segments = user_text.split("\n\n", 1)[-1].splitlines()
+            return "\n".join(re.sub(r"^(\[\d+\])\s*", r"\1 【模拟翻译】", line) for line in segments)
+        elif "翻译" in prompt:
+            text = user_text.split("\n\n", 1)[-1]
+            return f"【模拟翻译】{text}"
+        elif "重写" in prompt or "rewrite" in prompt.lower():
+            return "【模拟重写】这是重写后的内容，符合爱国键盘侠偏好风格：理性冷静、用词精准、逻辑清晰，增强爱国情怀。"
+        elif "分析" in prompt or "analyze" in prompt.lower():
+            return json.dumps({
+                "sentiment_score": 0.7,
+                "patriotic_level": 0.8,
+                "tech_relevance": 0.6,
+                "formality": 0.7,
+                "sensationalism": 0.3,
+                "clickbait_score": 0.2,
+                "main_topics": ["测试", "模拟"],
+                "recommended_action": "keep"
+            }, ensure_ascii=False)
+        elif "简报" in prompt or "briefing" in prompt.lower():
+            return """【模拟简报】一年365赢测试简报
+
+1. 🚀 中国科技突破模拟新闻
+   我国在人工智能领域取得重大进展...
+
+2. 📈 经济发展亮点模拟
+   中国经济展现强大韧性...
+
+3. 🌍 国际对比模拟分析
+   中国模式优势日益凸显...
+
+系统匹配度：95% | 爱国指数：★★★★★"""
+        else:
+            return "【模拟响应】这是DeepSeek API的模拟响应，用于测试目的。"
+
+    def get_stats(self) -> Dict:
+        """获取模拟统计"""
+        with self.lock:
+            return self.stats.copy()
+
+
+def error_body(message: str, code: str) -> Dict:
+    """OpenAI格式的错误响应体"""
+    return {"error": {"message": message, "type": code, "code": code}}
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """替身服务请求处理"""
+
+    server_version = "365winStandIn/1.0"
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+            self.send_json(404, {}, error_body("Not found", "not_found"))
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length).decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            self.send_json(400, {}, error_body("Invalid JSON body", "invalid_request_error"))
+            return
+
+        status, headers, body = self.server.simulator.handle(payload)
+        self.send_json(status, headers, body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self.send_json(200, {}, {"status": "ok"})
+        elif self.path.rstrip("/") == "/stats":
+            self.send_json(200, {}, self.server.simulator.get_stats())
+        else:
+            self.send_json(404, {}, error_body("Not found", "not_found"))
+
+    def send_json(self, status: int, headers: Dict, body: Dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # 压测时不输出访问日志
+        pass
+
+
+class LocalLLMServer:
+    """本地OpenAI兼容替身服务
+
+    用法：
+        server = LocalLLMServer(latency_ms=300, rate_limit_rps=5)
+        base_url = server.start()
+        client = DeepSeekClient(api_key="local", base_url=base_url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **simulator_options):
+        self.simulator = StandInSimulator(**simulator_options)
+        self.httpd = ThreadingHTTPServer((host, port), StandInRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.simulator = self.simulator
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """后台启动服务，返回base_url"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="一年365赢本地LLM替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300, help="基础延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="延迟抖动标准差（毫秒）")
+    parser.add_argument("--per-token-ms", type=float, default=0, help="每个输出token的生成耗时（毫秒）")
+    parser.add_argument("--rps", type=float, default=None, help="限流速率（请求/秒），超出返回429")
+    parser.add_argument("--burst", type=int, default=None, help="令牌桶容量")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机500错误比例")
+
+    args = parser.parse_args()
+
+    server = LocalLLMServer(
+        args.host, args.port,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        per_token_ms=args.per_token_ms,
+        rate_limit_rps=args.rps,
+        rate_limit_burst=args.burst,
+        error_rate=args.error_rate
+    )
+
+    print(f"本地LLM替身服务已启动: {server.base_url}")
+    print("设置 deepseek.base_url 指向该地址即可离线测试")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -13,88 +13,16 @@ from typing import Dict, List, Optional
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scripts.deepseek_client import DeepSeekClient
+from scripts.llm_backend import StandInBackend
+from scripts.article_features import ArticleFeatureStore
+from scripts.deadline import Deadline, current_deadline, deadline_scope
+from scripts.timestamps import parse_timestamp
 from scripts.content_processor import ContentProcessor
 from scripts.recommendation_engine import RecommendationEngine
 from scripts.feedback_system import FeedbackSystem
+from scripts.profile_service import ProfileService
 from scripts.hybrid_crawler import HybridCrawler
 
-class MockDeepSeekClient:
-    """模拟DeepSeek客户端，用于测试"""
-    
-    def __init__(self):
-        self.request_count = 0
-        self.total_tokens = 0
-        
-    def call_api(self, prompt, system_prompt=None, temperature=0.3, max_tokens=2000, retry_count=3):
-        """模拟API调用"""
-        self.request_count += 1
-        self.total_tokens += 100
-        
-        # 根据提示词类型返回模拟响应
-        if "翻译" in prompt:
-            return "【模拟翻译】这是翻译后的内容，保持专业、准确的风格。"
-        elif "重写" in prompt or "rewrite" in prompt.lower():
-            return "【模拟重写】这是重写后的内容，符合爱国键盘侠偏好风格：理性冷静、用词精准、逻辑清晰，增强爱国情怀。"
-        elif "分析" in prompt or "analyze" in prompt.lower():
-            return json.dumps({
-                "sentiment_score": 0.8,
-                "patriotic_level": 0.9,
-                "tech_relevance": 0.7,
-                "formality": 0.8,
-                "sensationalism": 0.2,
-                "clickbait_score": 0.1,
-                "main_topics": ["科技", "爱国"],
-                "recommended_action": "keep"
-            }, ensure_ascii=False)
-        elif "简报" in prompt or "briefing" in prompt.lower():
-            return """【模拟简报】一年365赢测试简报
-
-1. 🚀 中国科技突破模拟新闻
-   我国在人工智能领域取得重大进展...
-
-2. 📈 经济发展亮点模拟
-   中国经济展现强大韧性...
-
-3. 🌍 国际对比模拟分析
-   中国模式优势日益凸显...
-
-系统匹配度：95% | 爱国指数：★★★★★"""
-        else:
-            return "【模拟响应】这是DeepSeek API的模拟响应，用于测试目的。"
-    
-    def translate_content(self, text, target_lang="zh"):
-        return f"【模拟翻译】{text}"
-    
-    def rewrite_content(self, text, style_requirements):
-        return f"【模拟重写】{text[:100]}...（已重写为爱国键盘侠风格）"
-    
-    def analyze_content(self, text):
-        return {
-            "sentiment_score": 0.7,
-            "patriotic_level": 0.8,
-            "tech_relevance": 0.6,
-            "formality": 0.7,
-            "sensationalism": 0.3,
-            "clickbait_score": 0.2,
-            "main_topics": ["测试", "模拟"],
-            "recommended_action": "keep"
-        }
-    
-    def generate_briefing(self, content_items, briefing_type):
-        items_text = "\n".join([f"{i+1}. {item.get('title', '无标题')}" for i, item in enumerate(content_items)])
-        return f"""【一年365赢】{briefing_type}测试简报
-
-{items_text}
-
-这是模拟生成的简报，用于测试系统工作流。"""
-    
-    def get_usage_stats(self):
-        return {
-            "request_count": self.request_count,
-            "total_tokens": self.total_tokens,
-            "estimated_cost": 0.0
-        }
-
 class Year365WinWorkflow:
     """一年365赢主工作流"""
     
@@ -149,28 +77,62 @@ class Year365WinWorkflow:
             self.logger.info("启用测试模式，使用模拟数据运行")
             test_mode = True
         
+        deepseek_config = self.system_config.get("deepseek", {})
+        
         if api_key and api_key != "test_mode_key" and api_key != "your_deepseek_api_key_here":
-            self.deepseek = DeepSeekClient(api_key)
+            self.deepseek = DeepSeekClient.from_config(deepseek_config, api_key)
             self.test_mode = False
             self.logger.info("使用真实的DeepSeek API")
         else:
-            # 创建模拟客户端
-            self.deepseek = MockDeepSeekClient()
+            # 使用本地替身后端（带延迟、限流和token模型）
+            self.deepseek = DeepSeekClient(
+                backend=StandInBackend(**deepseek_config.get("stand_in", {})),
+                translation_config=deepseek_config.get("translation"),
+                hedge_config=deepseek_config.get("hedging")
+            )
             self.test_mode = True
-            self.logger.info("使用模拟DeepSeek客户端（测试模式）")
+            self.logger.info("使用本地替身DeepSeek后端（测试模式）")
         
         # 网络爬虫（混合版本：真实爬取 + 高质量模拟数据）
         self.crawler = HybridCrawler("data/hybrid_content")
         
+        # 文章特征存储（处理和推荐共用，早中晚多次运行同一批文章时不重复扫描）
+        store_config = self.system_config.get("processing", {}).get("feature_store", {})
+        if store_config.get("enabled", True):
+            self.feature_store = ArticleFeatureStore(
+                db_path=store_config.get("path", "./cache/article_features.db"),
+                ttl_days=store_config.get("ttl_days", 7),
+                memory_entries=store_config.get("memory_entries", 20000)
+            )
+        else:
+            # 不持久化，仅在本进程内共用
+            self.feature_store = ArticleFeatureStore(db_path=None)
+        
         # 内容处理器
         config_path = f"{self.config_dir}/system_config.yaml"
-        self.processor = ContentProcessor(self.deepseek, config_path)
+        self.processor = ContentProcessor(self.deepseek, config_path, feature_store=self.feature_store)
+        
+        # 用户画像服务：静态配置 + 反馈学习模型，推荐引擎和反馈系统共用
+        self.profile_service = ProfileService(self.user_profile_path, model_path="data/user_model.json")
         
         # 推荐引擎
-        self.recommender = RecommendationEngine(self.user_profile_path, self.deepseek)
+        rec_config = self.system_config.get("recommendation", {})
+        self.recommender = RecommendationEngine(
+            self.user_profile_path, 
+            self.deepseek,
+            rerank_mode=rec_config.get("rerank_mode", "listwise"),
+            rerank_top_k=rec_config.get("rerank_top_k", 10),
+            freshness_half_life_hours=rec_config.get("freshness_half_life_hours", 48),
+            freshness_floor=rec_config.get("freshness_floor", 0.2),
+            diversity_lambda=rec_config.get("diversity_lambda", 0.7),
+            diversity_pool_factor=rec_config.get("diversity_pool_factor", 5),
+            embedding_config=rec_config.get("embedding"),
+            feature_store=self.feature_store,
+            profile_service=self.profile_service
+        )
         
         # 反馈系统
-        self.feedback = FeedbackSystem("patriotic_keyboard_warrior", "data")
+        self.feedback = FeedbackSystem("patriotic_keyboard_warrior", "data", profile_service=self.profile_service)
         
         self.logger.info("所有组件初始化完成")
     
@@ -185,17 +147,29 @@ class Year365WinWorkflow:
         self.logger.info(f"开始运行{workflow_type}工作流，使用缓存: {use_cached}")
         start_time = datetime.now()
         
+        # 翻译记忆按轮统计命中率
+        if self.deepseek.translation_memory:
+            self.deepseek.translation_memory.begin_run()
+        
+        # 端到端截止时间：所有LLM调用的超时都不会超过剩余时间
+        deadline = Deadline(self.system_config.get("scheduling", {}).get("workflow_deadline", 300))
+        
+        with deadline_scope(deadline):
+            return self._run_workflow_steps(workflow_type, use_cached, start_time, deadline)
+    
+    def _run_workflow_steps(self, workflow_type: str, use_cached: bool, start_time: datetime, deadline: Deadline):
+        """在截止时间内执行工作流各步骤"""
+        
         try:
             # 1. 采集真实数据
             raw_data = self.collect_sample_data(workflow_type, use_cached=use_cached)
             self.logger.info(f"采集到{len(raw_data)}条原始数据")
             
+            # 采集后立即向量化（按内容键，已入库的文章不重复计算）
+            self.recommender.index_items(raw_data)
+            
             # 2. 处理内容
-            processed_data = []
-            for item in raw_data:
-                processed = self.processor.process_content_item(item)
-                if processed:
-                    processed_data.append(processed)
+            processed_data = [item for item in self.processor.process_batch(raw_data) if item]
             
             self.logger.info(f"处理完成，保留{len(processed_data)}条内容")
             
@@ -220,6 +194,9 @@ class Year365WinWorkflow:
                 "processed_count": len(processed_data),
                 "recommended_count": len(recommendations),
                 "duration": (datetime.now() - start_time).total_seconds(),
+                "translation_memory": self.deepseek.get_usage_stats()["translation_memory"],
+                "deadline_remaining": round(deadline.remaining(), 1),
+                "feature_store": self.feature_store.get_stats(),
                 "success": True
             })
             
@@ -250,20 +227,25 @@ class Year365WinWorkflow:
             # 转换为标准格式
             formatted_items = []
             for i, item in enumerate(raw_items):
+                publish_time = item.get("published", datetime.now().isoformat())
                 formatted_item = {
                     "id": f"{workflow_type}_{i:03d}",
                     "title": item.get("title", "无标题"),
                     "content": item.get("summary", item.get("title", "")),
                     "source": item.get("source", "未知来源"),
                     "url": item.get("link", ""),
-                    "publish_time": item.get("published", datetime.now().isoformat()),
-                    "type": self._infer_content_type(item),
+                    "publish_time": publish_time,
+                    "publish_ts": parse_timestamp(publish_time),  # 采集时统一为epoch秒
                     "needs_translation": item.get("needs_translation", False),
                     "original_language": item.get("original_language", "en"),
                     "raw_data": item  # 保留原始数据
                 }
                 formatted_items.append(formatted_item)
             
+            # 内容类型取自特征存储（按内容键，已见过的文章不再扫描标题）
+            for formatted_item, features in zip(formatted_items, self.feature_store.text_features(formatted_items)):
+                formatted_item["type"] = features["content_type"]
+            
             self.logger.info(f"成功采集 {len(formatted_items)} 条真实数据")
             return formatted_items
             
@@ -272,31 +254,15 @@ class Year365WinWorkflow:
             # 失败时返回空列表，让系统处理
             return []
     
-    def _infer_content_type(self, item: Dict) -> str:
-        """推断内容类型"""
-        title = item.get("title", "").lower()
-        source = item.get("source", "").lower()
-        
-        # 关键词匹配
-        tech_keywords = ["tech", "ai", "5g", "quantum", "space", "航天", "科技", "人工智能", "量子", "computer", "software"]
-        politics_keywords = ["politics", "外交", "政策", "government", "习近平", "中国", "china", "political", "election"]
-        economy_keywords = ["economy", "经济", "金融", "market", "trade", "贸易", "stock", "bank", "finance"]
-        social_keywords = ["social", "微博", "知乎", "weibo", "zhihu", "trending", "hot"]
-        
-        if any(keyword in title for keyword in tech_keywords):
-            return "tech"
-        elif any(keyword in title for keyword in politics_keywords):
-            return "politics"
-        elif any(keyword in title for keyword in economy_keywords):
-            return "economy"
-        elif any(keyword in title for keyword in social_keywords) or "微博" in source or "知乎" in source:
-            return "social"
-        else:
-            return "general"
-    
     def generate_briefing(self, recommendations: List[Dict], briefing_type: str) -> str:
         """生成简报"""
         
+        # DeepSeek熔断或已到截止时间时直接使用本地备用简报
+        deadline = current_deadline()
+        if not self.deepseek.is_available() or (deadline and deadline.expired()):
+            self.logger.warning("DeepSeek不可用或已到截止时间，使用备用简报")
+            return self.generate_fallback_briefing(recommendations, briefing_type)
+        
         # 使用DeepSeek生成简报
         briefing = self.deepseek.generate_briefing(recommendations, briefing_type)
         
@@ -12,8 +12,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scripts.full_content_crawler import FullContentCrawler
 from scripts.deepseek_client import DeepSeekClient
+from scripts.llm_backend import StandInBackend
 from scripts.content_processor import ContentProcessor
 from scripts.recommendation_engine import RecommendationEngine
+from scripts.timestamps import parse_timestamp
 
 class OnDemandProcessor:
     """按需处理引擎"""
@@ -49,37 +51,8 @@ class OnDemandProcessor:
         print("✅ 按需处理引擎初始化完成")
     
     def create_mock_client(self):
-        """创建模拟客户端"""
-        class MockDeepSeekClient:
-            def __init__(self):
-                self.request_count = 0
-            
-            def analyze_content(self, text):
-                self.request_count += 1
-                return {
-                    "sentiment_score": 0.7,
-                    "patriotic_level": 0.6,
-                    "tech_relevance": 0.5,
-                    "formality": 0.6,
-                    "sensationalism": 0.3,
-                    "clickbait_score": 0.2,
-                    "main_topics": ["测试"],
-                    "recommended_action": "keep"
-                }
-            
-            def rewrite_content(self, text, style_requirements):
-                self.request_count += 1
-                return f"【爱国键盘侠风格重写】{text[:200]}..."
-            
-            def translate_content(self, text, target_lang="zh"):
-                self.request_count += 1
-                return f"【翻译】{text}"
-            
-            def generate_briefing(self, content_items, briefing_type):
-                self.request_count += 1
-                return f"【{briefing_type}简报】测试简报内容"
-        
-        return MockDeepSeekClient()
+        """创建模拟客户端（本地替身后端）"""
+        return DeepSeekClient(backend=StandInBackend())
     
     def load_content_for_processing(self, use_cached: bool = True) -> List[Dict]:
         """加载待处理的内容"""
@@ -96,13 +69,15 @@ class OnDemandProcessor:
         # 转换为标准格式
         formatted_items = []
         for i, article in enumerate(articles):
+            publish_time = article.get("crawl_time", datetime.now().isoformat())
             formatted_item = {
                 "id": f"article_{i:03d}",
                 "title": article.get("title", "无标题"),
                 "content": article.get("content", ""),
                 "source": article.get("source", "未知来源"),
                 "url": article.get("url", ""),
-                "publish_time": article.get("crawl_time", datetime.now().isoformat()),
+                "publish_time": publish_time,
+                "publish_ts": parse_timestamp(publish_time),  # 采集时统一为epoch秒
                 "type": article.get("category", "general"),
                 "needs_translation": article.get("needs_translation", False),
                 "original_language": article.get("original_language", "en"),
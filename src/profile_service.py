@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# 用户画像服务：静态配置 + 反馈学习模型
+
+import os
+import copy
+import json
+import time
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional
+
+
+def freeze(value: Any) -> Any:
+    """递归转为只读结构（dict → MappingProxyType，list → tuple）"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """只读结构转回普通dict/list（用于修改后重新发布）"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def shift_weights(static: Dict[str, float], learned: Dict[str, float]) -> Dict[str, float]:
+    """把学习到的权重合并到静态权重上
+
+    学习模型中的权重都从0.5起步，按反馈上下调整，因此只取相对0.5的偏移量
+    叠加到静态权重上；静态配置中没有的键直接采用学习值。
+    """
+    merged = dict(static)
+    for key, weight in learned.items():
+        if not isinstance(weight, (int, float)):
+            continue
+        if key in merged:
+            merged[key] = max(0.0, min(1.0, merged[key] + weight - 0.5))
+        else:
+            merged[key] = max(0.0, min(1.0, weight))
+    return merged
+
+
+def merge_profile(profile: Dict, user_model: Optional[Dict]) -> Dict:
+    """合并静态用户配置和反馈学习模型"""
+    merged = copy.deepcopy(profile)
+    if not user_model:
+        return merged
+
+    preferences = merged.setdefault("preferences", {})
+    learned = user_model.get("preference_weights", {})
+
+    preferences["topic_weights"] = shift_weights(preferences.get("topic_weights", {}), learned.get("topics", {}))
+    preferences["style_preferences"] = shift_weights(preferences.get("style_preferences", {}), learned.get("styles", {}))
+    # 来源学习值按具体来源名称记录，与按来源类型的source_weights分开保存
+    preferences["learned_source_weights"] = dict(learned.get("sources", {}))
+
+    comfort = user_model.get("comfort_levels", {})
+    if "recent_satisfaction" in comfort:
+        merged.setdefault("feedback_stats", {})["satisfaction_rate"] = comfort["recent_satisfaction"]
+
+    merged["learned"] = {
+        "behavior_patterns": copy.deepcopy(user_model.get("behavior_patterns", {})),
+        "comfort_levels": copy.deepcopy(comfort),
+        "last_updated": user_model.get("last_updated")
+    }
+    return merged
+
+
+class ProfileSnapshot:
+    """某一版本的用户画像（只读）
+
+    由画像派生的结构（排序后的话题权重、黑名单自动机等）通过derived()按快照缓存，
+    快照不可变，因此同一版本只计算一次，版本变化后自然失效。
+    """
+
+    def __init__(self, version: int, profile: Dict):
+        self.version = version
+        self.profile = freeze(profile)
+        self.cache = {}
+        self.lock = threading.RLock()  # 派生结构可以依赖其他派生结构
+
+    def __getitem__(self, key: str):
+        return self.profile[key]
+
+    def get(self, key: str, default=None):
+        return self.profile.get(key, default)
+
+    def derived(self, name: str, build: Callable[["ProfileSnapshot"], Any]) -> Any:
+        """按名称缓存派生结构"""
+        with self.lock:
+            if name not in self.cache:
+                self.cache[name] = build(self)
+            return self.cache[name]
+
+    def to_dict(self) -> Dict:
+        """可修改的副本"""
+        return thaw(self.profile)
+
+
+class ProfileService:
+    """共享的用户画像服务
+
+    合并静态配置（user_profile.json）与反馈系统学习的模型（user_model.json），
+    发布带版本号的只读快照。文件按修改时间热加载（检查间隔内不重复stat），
+    反馈系统也可以直接在进程内发布新模型。推荐引擎只在版本变化时重建派生结构。
+    """
+
+    def __init__(self,
+                 profile_path: str,
+                 model_path: Optional[str] = None,
+                 check_interval: float = 5.0):
+        self.profile_path = profile_path
+        self.model_path = model_path
+        self.check_interval = check_interval
+
+        self.lock = threading.Lock()
+        self.version = 0
+        self.static_profile = {}
+        self.user_model = None
+        self.file_stamps = (None, None)
+        self.last_check = 0.0
+        self.current = None
+
+        self.reload()
+
+    def snapshot(self) -> ProfileSnapshot:
+        """当前快照（文件变化时重新加载）"""
+        if time.time() - self.last_check >= self.check_interval:
+            self.reload()
+        return self.current
+
+    def reload(self, force: bool = False) -> bool:
+        """文件有变化时重新加载并发布新版本，返回是否发布"""
+        with self.lock:
+            self.last_check = time.time()
+            stamps = (self.file_stamp(self.profile_path), self.file_stamp(self.model_path))
+            if not force and self.current is not None and stamps == self.file_stamps:
+                return False
+
+            try:
+                if stamps[0] != self.file_stamps[0] or self.current is None:
+                    self.static_profile = self.load_json(self.profile_path)
+                if self.model_path and stamps[1] != self.file_stamps[1]:
+                    self.user_model = self.load_json(self.model_path) if stamps[1] else None
+            except (OSError, json.JSONDecodeError) as e:
+                # 文件正在写入或格式错误时保留上一版本
+                if self.current is None:
+                    raise
+                print(f"⚠️  用户画像加载失败，继续使用版本{self.version}: {e}")
+                return False
+
+            self.file_stamps = stamps
+            self.publish_locked()
+            return True
+
+    def publish_profile(self, profile: Dict):
+        """直接替换静态配置（不写文件）"""
+        with self.lock:
+            self.static_profile = copy.deepcopy(profile)
+            self.publish_locked()
+
+    def publish_model(self, user_model: Dict):
+        """反馈系统保存学习模型后直接发布，无需等待文件热加载"""
+        with self.lock:
+            self.user_model = copy.deepcopy(user_model)
+            # 记下刚写入的文件时间戳，避免热加载时重复发布
+            self.file_stamps = (self.file_stamps[0], self.file_stamp(self.model_path))
+            self.publish_locked()
+
+    def publish_locked(self):
+        """生成新版本快照（调用方持有锁）"""
+        self.version += 1
+        self.current = ProfileSnapshot(self.version, merge_profile(self.static_profile, self.user_model))
+
+    @staticmethod
+    def file_stamp(path: Optional[str]):
+        """文件的(修改时间, 大小)，不存在时为None"""
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def load_json(path: str) -> Dict:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
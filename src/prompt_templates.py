@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# 提示词模板注册表
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from .llm_backend import estimate_tokens
+
+
+class PromptTemplate:
+    """提示词模板
+
+    system部分只包含固定内容（以及极少变化的参数，如风格要求），
+    变化的正文全部放在user部分末尾，保证请求前缀稳定，
+    从而命中服务端的前缀缓存（DeepSeek上下文硬盘缓存）。
+    """
+
+    def __init__(self,
+                 name: str,
+                 system: str,
+                 user: str,
+                 compact_system: str = None,
+                 compact_user: str = None):
+        self.name = name
+        self.system = system
+        self.user = user
+        self.compact_system = compact_system or system
+        self.compact_user = compact_user or user
+
+        # 模板自身（不含填充字段）的token数
+        self.system_tokens = estimate_tokens(system)
+        self.compact_system_tokens = estimate_tokens(self.compact_system)
+
+    def render(self, compact: bool = False, **fields) -> Tuple[str, str]:
+        """渲染模板，返回(system_prompt, user_prompt)"""
+        system_fields = tuple(sorted((k, v) for k, v in fields.items() if "{" + k + "}" in self.system))
+        system_prompt = self.render_system(compact, system_fields)
+        user_template = self.compact_user if compact else self.user
+        return system_prompt, user_template.format(**fields)
+
+    @lru_cache(maxsize=32)
+    def render_system(self, compact: bool, system_fields: Tuple) -> str:
+        """渲染system部分（同样的参数只渲染一次）"""
+        template = self.compact_system if compact else self.system
+        return template.format(**dict(system_fields))
+
+    def input_tokens_saved(self, **fields) -> int:
+        """紧凑模式相对完整模式节省的输入token数"""
+        full = self.render(compact=False, **fields)
+        compact = self.render(compact=True, **fields)
+        return estimate_tokens(full[0] + full[1]) - estimate_tokens(compact[0] + compact[1])
+
+
+class PromptRegistry:
+    """提示词模板注册表"""
+
+    def __init__(self):
+        self.templates = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        self.templates[template.name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        if name not in self.templates:
+            raise KeyError(f"未注册的提示词模板: {name}")
+        return self.templates[name]
+
+    def token_report(self) -> Dict[str, Dict]:
+        """各模板固定部分的token数"""
+        return {
+            name: {
+                "system_tokens": template.system_tokens,
+                "compact_system_tokens": template.compact_system_tokens
+            }
+            for name, template in self.templates.items()
+        }
+
+
+PROMPTS = PromptRegistry()
+
+PROMPTS.register(PromptTemplate(
+    "translate",
+    system="你是一个专业的翻译助手，擅长将各种语言的内容准确翻译成中文。翻译时保持专业、准确的风格，只输出译文。",
+    user="请将以下内容翻译成{target_lang}：\n\n{text}",
+    compact_system="专业翻译，风格准确，只输出译文。",
+    compact_user="译为{target_lang}：\n\n{text}"
+))
+
+PROMPTS.register(PromptTemplate(
+    "translate_segments",
+    system="""你是一个专业的翻译助手，擅长将各种语言的内容准确翻译成中文。翻译时保持专业、准确的风格。
+输入每行是一个带编号的句子，格式为“[编号] 句子”。请逐句翻译，每行输出一句，保留原编号，不要合并或拆分句子，只输出译文。""",
+    user="请将以下句子翻译成{target_lang}：\n\n{segments}",
+    compact_system="专业翻译，风格准确。逐行翻译“[编号] 句子”，每行一句，保留编号，只输出译文。",
+    compact_user="译为{target_lang}：\n\n{segments}"
+))
+
+PROMPTS.register(PromptTemplate(
+    "rewrite",
+    system="""你是一个专业的内容编辑，擅长将各种风格的内容重写为符合爱国键盘侠偏好的风格。
+
+重写要求：
+1. 语言风格：理性冷静、用词精准、逻辑清晰
+2. 情感处理：增强爱国情怀，转为积极正面表达
+3. 结构优化：确保段落分明，重点突出
+4. 语气调整：避免轻佻、夸张、网络流行语
+5. 信息保留：保留所有核心事实和信息点
+6. 爱国增强：适当添加爱国情感和民族自豪感
+
+{style_requirements}""",
+    user="请重写以下内容：\n{text}\n\n重写后的内容：",
+    compact_system="""内容编辑：将内容重写为爱国键盘侠偏好风格。
+要求：理性精准、逻辑清晰、积极正面、增强爱国情怀；避免轻佻夸张和网络流行语；保留全部核心事实。
+
+{style_requirements}""",
+    compact_user="重写：\n{text}"
+))
+
+PROMPTS.register(PromptTemplate(
+    "analyze",
+    system="""你是一个内容分析专家，擅长分析文本的情感倾向、风格特征和主题内容。
+请以JSON格式返回分析结果，包含以下字段：
+- sentiment_score: 情感分数（-1到1，负数为负面）
+- patriotic_level: 爱国程度（0-1）
+- tech_relevance: 科技相关性（0-1）
+- formality: 正式程度（0-1）
+- sensationalism: 煽情程度（0-1）
+- clickbait_score: 标题党程度（0-1）
+- main_topics: 主要话题列表
+- recommended_action: 建议处理方式（keep/rewrite/filter）""",
+    user="分析以下内容：\n\n{text}",
+    compact_system="""内容分析，只返回JSON：
+sentiment_score(-1~1), patriotic_level, tech_relevance, formality, sensationalism, clickbait_score(0~1),
+main_topics(列表), recommended_action(keep/rewrite/filter)""",
+    compact_user="分析：\n\n{text}"
+))
+
+PROMPTS.register(PromptTemplate(
+    "briefing",
+    system="""你是一个专业的简报编辑，擅长将多个内容项组织成结构清晰、阅读流畅的简报。
+简报风格：积极正面、信息丰富、鼓舞人心。
+
+简报要求：
+1. 开头：吸引人的标题和简短引言
+2. 主体：清晰列出每个内容项，突出亮点
+3. 结尾：总结和积极展望
+4. 风格：符合爱国键盘侠偏好，积极正面
+5. 格式：使用适当的emoji和分段""",
+    user="请根据以下内容项生成{briefing_type}简报：\n\n{items_text}\n请输出完整的简报内容：",
+    compact_system="""简报编辑：积极正面、鼓舞人心。
+结构：标题+引言；逐条列出内容突出亮点；总结展望。适当使用emoji和分段。""",
+    compact_user="生成{briefing_type}简报：\n\n{items_text}"
+))
+
+
+if __name__ == "__main__":
+    # 输出各模板的token数
+    import json
+
+    print(json.dumps(PROMPTS.token_report(), ensure_ascii=False, indent=2))
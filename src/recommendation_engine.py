@@ -2,23 +2,100 @@
 # 推荐引擎
 
 import os
-import json
+import re
 import math
+import time
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from .article_features import ArticleFeatureStore, classify_source, keyword_group
+from .batch_scoring import (
+    DEFAULT_RECOMMENDATION_WEIGHTS, RECOMMENDATION_FEATURES, cosine_matrix, mmr_select,
+    tag_jaccard_matrix, top_k_indices, weight_vector
+)
+from .embedding_index import ContentEmbeddingIndex
+from .keyword_matcher import KeywordAutomaton
+from .profile_service import ProfileService, ProfileSnapshot
+from .timestamps import parse_timestamp
+
 class RecommendationEngine:
     """智能推荐引擎"""
     
-    def __init__(self, user_profile_path: str, deepseek_client):
-        self.user_profile = self.load_user_profile(user_profile_path)
+    # DeepSeek重排方式：listwise（对本地top-K一次性重排）、pointwise（逐条调整）、none
+    RERANK_MODES = ("listwise", "pointwise", "none")
+    
+    def __init__(self, 
+                 user_profile_path: str, 
+                 deepseek_client,
+                 rerank_mode: str = "listwise",
+                 rerank_top_k: int = 10,
+                 freshness_half_life_hours: float = 48,
+                 freshness_floor: float = 0.2,
+                 diversity_lambda: float = 0.7,
+                 diversity_pool_factor: int = 5,
+                 embedding_config: Dict = None,
+                 feature_store: Optional[ArticleFeatureStore] = None,
+                 profile_service: Optional[ProfileService] = None):
+        if rerank_mode not in self.RERANK_MODES:
+            raise ValueError(f"未知的重排方式: {rerank_mode}")
+        
+        # 用户画像：共享服务发布的只读快照，版本变化时才切换
+        self.profile_service = profile_service or ProfileService(user_profile_path)
+        self.snapshot = self.profile_service.snapshot()
         self.deepseek = deepseek_client
+        self.rerank_mode = rerank_mode
+        self.rerank_top_k = rerank_top_k
+        
+        # 新鲜度：floor + (1 - floor) * 0.5^(发布小时数 / 半衰期)
+        self.freshness_half_life_hours = freshness_half_life_hours
+        self.freshness_floor = freshness_floor
+        
+        # 多样性：从前 count × pool_factor 个候选中做MMR选择
+        self.diversity_lambda = diversity_lambda
+        self.diversity_pool_factor = diversity_pool_factor
         self.recommendation_history = []
         
-    def load_user_profile(self, profile_path: str) -> Dict:
-        """加载用户配置文件"""
-        with open(profile_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        # 文章向量索引：话题匹配度和多样性相似度都基于它
+        embedding_config = embedding_config or {}
+        if embedding_config.get("enabled", True):
+            self.embedding_index = ContentEmbeddingIndex(
+                dim=embedding_config.get("dim", 1024),
+                max_entries=embedding_config.get("max_entries", 5000)
+            )
+        else:
+            self.embedding_index = None
+        self.topic_similarity_threshold = embedding_config.get("similarity_threshold", 0.3)
+        self.prototype_version = None
+        
+        # 文章特征存储（与内容处理器共用）：来源类型、黑名单关键词命中按文章只算一次
+        self.feature_store = feature_store
+        
+        # 评分权重向量（顺序见RECOMMENDATION_FEATURES）
+        self.score_weights = weight_vector(DEFAULT_RECOMMENDATION_WEIGHTS)
+        
+    @property
+    def user_profile(self) -> ProfileSnapshot:
+        """当前用户画像快照"""
+        return self.snapshot
+    
+    @property
+    def profile_version(self) -> int:
+        return self.snapshot.version
+    
+    def refresh_profile(self) -> bool:
+        """切换到画像服务的最新快照，返回版本是否变化"""
+        snapshot = self.profile_service.snapshot()
+        if snapshot.version == self.snapshot.version:
+            return False
+        self.snapshot = snapshot
+        return True
+    
+    def update_user_profile(self, user_profile: Dict):
+        """替换用户配置（发布新版本，偏好摘要等派生结构随之失效）"""
+        self.profile_service.publish_profile(user_profile)
+        self.refresh_profile()
     
     def recommend_content(self, 
                          content_items: List[Dict], 
@@ -29,16 +106,22 @@ class RecommendationEngine:
         if not content_items:
             return []
         
-        # 为每个内容项评分
+        self.refresh_profile()
+        
+        # 整批评分，只对正分内容取前若干个（部分选择，不做全量排序）
+        scores = self.score_batch(content_items, time_of_day)
+        positive = np.flatnonzero(scores > 0)
+        pool_size = max(self.rerank_top_k, count * self.diversity_pool_factor)
+        
         scored_items = []
-        for item in content_items:
-            score = self.score_content(item, time_of_day)
-            if score > 0:  # 只考虑正分内容
-                item["recommendation_score"] = score
-                scored_items.append(item)
+        for index in positive[top_k_indices(scores[positive], pool_size)]:
+            item = content_items[index]
+            item["recommendation_score"] = float(scores[index])
+            scored_items.append(item)
         
-        # 按分数排序
-        scored_items.sort(key=lambda x: x["recommendation_score"], reverse=True)
+        # 对本地top-K做一次DeepSeek列表重排
+        if self.rerank_mode == "listwise":
+            scored_items = self.listwise_rerank(scored_items)
         
         # 选择top N，考虑多样性
         selected = self.select_with_diversity(scored_items, count)
@@ -50,130 +133,146 @@ class RecommendationEngine:
     
     def score_content(self, item: Dict, time_of_day: str) -> float:
         """计算内容推荐分数"""
-        
-        scores = {
-            "topic_score": self.calculate_topic_score(item),
-            "style_score": self.calculate_style_score(item),
-            "source_score": self.calculate_source_score(item),
-            "time_score": self.calculate_time_score(item, time_of_day),
-            "freshness_score": self.calculate_freshness_score(item),
-            "quality_score": item.get("quality_score", 0.5),
-            "blacklist_penalty": self.calculate_blacklist_penalty(item)
+        return float(self.score_batch([item], time_of_day)[0])
+    
+    def feature_matrix(self, items: List[Dict], time_of_day: str) -> np.ndarray:
+        """候选内容的评分特征矩阵（N × 特征数，列顺序见RECOMMENDATION_FEATURES）"""
+        
+        columns = {
+            "topic_score": self.calculate_topic_scores(items),
+            "style_score": self.calculate_style_scores(items),
+            "source_score": self.calculate_source_scores(items),
+            "time_score": [self.calculate_time_score(item, time_of_day) for item in items],
+            "freshness_score": self.calculate_freshness_scores(items),
+            "quality_score": [item.get("quality_score", 0.5) for item in items],
+            "blacklist_penalty": self.calculate_blacklist_penalties(items)
         }
         
-        # 权重配置
-        weights = {
-            "topic_score": 0.35,
-            "style_score": 0.20,
-            "source_score": 0.15,
-            "time_score": 0.10,
-            "freshness_score": 0.05,
-            "quality_score": 0.15,
-            "blacklist_penalty": -0.1  # 惩罚项
-        }
+        return np.column_stack([np.asarray(columns[name], dtype=float) for name in RECOMMENDATION_FEATURES])
+    
+    def score_batch(self, items: List[Dict], time_of_day: str) -> np.ndarray:
+        """批量计算推荐分数：特征矩阵 × 权重向量"""
         
-        # 计算加权总分
-        total_score = 0
-        for key in scores:
-            total_score += scores[key] * weights[key]
+        if not items:
+            return np.zeros(0)
         
-        # 使用DeepSeek进行最终调整
-        final_score = self.deepseek_adjustment(item, total_score)
+        self.refresh_profile()
+        scores = self.feature_matrix(items, time_of_day) @ self.score_weights
         
-        return max(0, min(1, final_score))  # 限制在0-1之间
+        # 逐条模式下使用DeepSeek进行最终调整（listwise模式在推荐阶段统一重排）
+        if self.rerank_mode == "pointwise":
+            scores = np.array([self.deepseek_adjustment(item, float(score)) for item, score in zip(items, scores)])
+        
+        return np.clip(scores, 0, 1)  # 限制在0-1之间
+    
+    def index_items(self, items: List[Dict]) -> int:
+        """采集后将文章向量化入库（每篇只计算一次）"""
+        if not self.embedding_index:
+            return 0
+        return self.embedding_index.add_items(items)
     
     def calculate_topic_score(self, item: Dict) -> float:
         """计算话题匹配度"""
+        return float(self.calculate_topic_scores([item])[0])
+    
+    def calculate_topic_scores(self, items: List[Dict]) -> np.ndarray:
+        """批量计算话题匹配度
         
-        item_topics = item.get("tags", [])
-        if not item_topics:
-            return 0.5  # 默认值
+        标签命中用户话题时取最高话题权重；否则用文章向量与各话题原型的相似度，
+        按最接近话题的权重打分，相似度越低越接近默认值0.5。
+        """
         
         user_topic_weights = self.user_profile["preferences"]["topic_weights"]
         
-        # 计算最高的话题权重
-        max_score = 0
-        for topic in item_topics:
-            score = user_topic_weights.get(topic, 0.5)
-            max_score = max(max_score, score)
-        
-        return max_score
+        tag_scores = np.array([
+            max((user_topic_weights[tag] for tag in item.get("tags", []) if tag in user_topic_weights), default=np.nan)
+            for item in items
+        ], dtype=float)
+        
+        semantic_scores = np.full(len(items), 0.5)
+        if self.embedding_index and items:
+            self.refresh_topic_prototypes()
+            similarity = self.embedding_index.topic_similarity(items)
+            if similarity.shape[1]:
+                topic_weights = np.array([user_topic_weights[t] for t in self.embedding_index.topics])
+                best = similarity.argmax(axis=1)
+                best_similarity = similarity[np.arange(len(items)), best]
+                confidence = np.clip(best_similarity / self.topic_similarity_threshold, 0, 1)
+                semantic_scores = 0.5 + confidence * (topic_weights[best] - 0.5)
+        
+        return np.where(np.isnan(tag_scores), semantic_scores, tag_scores)
+    
+    def refresh_topic_prototypes(self):
+        """用户配置变化后重建话题原型"""
+        if self.prototype_version == self.profile_version:
+            return
+        preferences = self.user_profile["preferences"]
+        descriptions = preferences.get("topic_prototypes", {})
+        self.embedding_index.set_prototypes({
+            topic: descriptions.get(topic, "") for topic in preferences["topic_weights"]
+        })
+        self.prototype_version = self.profile_version
     
     def calculate_style_score(self, item: Dict) -> float:
         """计算风格匹配度"""
+        return float(self.calculate_style_scores([item])[0])
+    
+    def calculate_style_scores(self, items: List[Dict]) -> np.ndarray:
+        """批量计算风格匹配度（没有风格分析的内容为0.5）"""
         
-        # 从内容分析中获取风格特征
-        style_features = item.get("original_style", {})
-        if not style_features:
-            return 0.5
+        styles = [item.get("original_style") or {} for item in items]
+        has_style = np.array([bool(style) for style in styles])
         
         user_style_prefs = self.user_profile["preferences"]["style_preferences"]
-        
-        # 计算关键风格特征的匹配度
-        style_scores = []
-        
-        # 爱国程度匹配
-        patriotic_level = style_features.get("patriotic_level", 0.5)
         patriotic_pref = user_style_prefs.get("patriotic_tone", 0.8)
-        patriotic_score = 1 - abs(patriotic_level - patriotic_pref)
-        style_scores.append(patriotic_score * 0.4)
-        
-        # 正式程度匹配
-        formality = style_features.get("formality", 0.5)
         formality_pref = user_style_prefs.get("formality", 0.8)
-        formality_score = 1 - abs(formality - formality_pref)
-        style_scores.append(formality_score * 0.3)
-        
-        # 情感程度匹配
-        emotional = style_features.get("sentiment_score", 0)
         emotional_pref = user_style_prefs.get("emotional_level", 0.7)
-        # 用户喜欢正面情感
-        if emotional >= 0:
-            emotional_score = 1 - abs(emotional - emotional_pref)
-        else:
-            emotional_score = 0.2  # 负面情感低分
-        style_scores.append(emotional_score * 0.3)
         
-        return sum(style_scores)
+        patriotic_level = np.array([style.get("patriotic_level", 0.5) for style in styles], dtype=float)
+        formality = np.array([style.get("formality", 0.5) for style in styles], dtype=float)
+        emotional = np.array([style.get("sentiment_score", 0) for style in styles], dtype=float)
+        
+        # 爱国程度、正式程度匹配
+        patriotic_score = 1 - np.abs(patriotic_level - patriotic_pref)
+        formality_score = 1 - np.abs(formality - formality_pref)
+        
+        # 情感程度匹配：用户喜欢正面情感，负面情感低分
+        emotional_score = np.where(emotional >= 0, 1 - np.abs(emotional - emotional_pref), 0.2)
+        
+        scores = patriotic_score * 0.4 + formality_score * 0.3 + emotional_score * 0.3
+        return np.where(has_style, scores, 0.5)
     
     def calculate_source_score(self, item: Dict) -> float:
         """计算来源可信度"""
+        return float(self.calculate_source_scores([item])[0])
+    
+    def calculate_source_scores(self, items: List[Dict]) -> np.ndarray:
+        """批量计算来源可信度（没有来源的内容为0.5）"""
         
-        source = item.get("source", "")
-        if not source:
-            return 0.5
-        
-        source_weights = self.user_profile["preferences"]["source_weights"]
+        preferences = self.user_profile["preferences"]
+        source_weights = preferences["source_weights"]
+        learned_weights = preferences.get("learned_source_weights", {})
         
         # 尝试匹配来源类型
-        source_type = self.classify_source(source)
-        return source_weights.get(source_type, 0.5)
+        if self.feature_store:
+            source_types = [features["source_type"] for features in self.feature_store.text_features(items)]
+        else:
+            source_types = [self.classify_source(item.get("source", "")) for item in items]
+        
+        scores = np.array([
+            source_weights.get(source_type, 0.5) if item.get("source") else 0.5
+            for item, source_type in zip(items, source_types)
+        ], dtype=float)
+        
+        # 反馈学习到的具体来源偏好（相对0.5的偏移）
+        if learned_weights:
+            shifts = np.array([learned_weights.get(item.get("source", ""), 0.5) - 0.5 for item in items])
+            scores = np.clip(scores + shifts, 0, 1)
+        return scores
     
     def classify_source(self, source: str) -> str:
-        """分类来源类型"""
-        
-        source_lower = source.lower()
-        
-        # 官方媒体
-        official_keywords = ["人民", "新华", "央视", "求是", "学习强国"]
-        for keyword in official_keywords:
-            if keyword in source_lower:
-                return "official_media"
-        
-        # 科技媒体
-        tech_keywords = ["科技", "创新", "数码", "it", "人工智能"]
-        for keyword in tech_keywords:
-            if keyword in source_lower:
-                return "tech_media"
-        
-        # 学术来源
-        academic_keywords = ["大学", "学院", "研究", "科学", "学术"]
-        for keyword in academic_keywords:
-            if keyword in source_lower:
-                return "academic"
-        
-        # 默认
-        return "mainstream_media"
+        """分类来源类型（官方媒体 > 科技媒体 > 学术来源 > 主流媒体）"""
+        return classify_source(source)
     
     def calculate_time_score(self, item: Dict, time_of_day: str) -> float:
         """计算时间匹配度"""
@@ -190,65 +289,82 @@ class RecommendationEngine:
     
     def calculate_freshness_score(self, item: Dict) -> float:
         """计算新鲜度"""
+        return float(self.calculate_freshness_scores([item])[0])
+    
+    def calculate_freshness_scores(self, items: List[Dict], now: float = None) -> np.ndarray:
+        """批量计算新鲜度：按发布时长连续指数衰减，发布时间未知的为0.5"""
         
-        publish_time = item.get("publish_time")
-        if not publish_time:
-            return 0.5
+        timestamps = np.array([self.publish_timestamp(item) for item in items], dtype=float)
+        known = ~np.isnan(timestamps)
         
-        try:
-            # 解析发布时间
-            if isinstance(publish_time, str):
-                # 尝试解析ISO格式
-                from datetime import datetime
-                publish_dt = datetime.fromisoformat(publish_time.replace('Z', '+00:00'))
-            else:
-                # 假设是timestamp
-                publish_dt = datetime.fromtimestamp(publish_time)
-            
-            # 计算时间差（小时）
-            now = datetime.now()
-            hours_diff = (now - publish_dt).total_seconds() / 3600
-            
-            # 新鲜度衰减：24小时内新鲜，之后衰减
-            if hours_diff <= 24:
-                return 1.0
-            elif hours_diff <= 168:  # 一周内
-                return 0.7
-            else:
-                return 0.3
-                
-        except:
-            return 0.5
+        unparsed = sum(1 for item, ok in zip(items, known) if not ok and item.get("publish_time"))
+        if unparsed:
+            print(f"⚠️  {unparsed}条内容的发布时间无法解析，新鲜度按0.5计算")
+        
+        now = time.time() if now is None else now
+        age_hours = np.maximum(0.0, (now - np.where(known, timestamps, now)) / 3600)
+        decay = np.power(0.5, age_hours / self.freshness_half_life_hours)
+        scores = self.freshness_floor + (1 - self.freshness_floor) * decay
+        
+        return np.where(known, scores, 0.5)
+    
+    def publish_timestamp(self, item: Dict) -> float:
+        """发布时间（epoch秒）；采集时未归一化的在这里解析一次并写回"""
+        if "publish_ts" not in item:
+            item["publish_ts"] = parse_timestamp(item.get("publish_time"))
+        ts = item["publish_ts"]
+        return float("nan") if ts is None else ts
     
     def calculate_blacklist_penalty(self, item: Dict) -> float:
         """计算黑名单惩罚"""
+        return float(self.calculate_blacklist_penalties([item])[0])
+    
+    def calculate_blacklist_penalties(self, items: List[Dict]) -> np.ndarray:
+        """批量计算黑名单惩罚（作者0.5、媒体0.3、关键词0.2，按列累加）"""
         
         blacklists = self.user_profile["preferences"]["blacklists"]
+        authors = set(blacklists["authors"])
+        media = set(blacklists["media"])
         
-        penalty = 0
+        author_hits = np.array([item.get("author", "") in authors for item in items], dtype=float)
+        media_hits = np.array([item.get("source", "") in media for item in items], dtype=float)
+        keyword_hits = np.array(self.blacklist_keyword_hits(items), dtype=float)
         
-        # 检查作者黑名单
-        author = item.get("author", "")
-        if author in blacklists["authors"]:
-            penalty += 0.5
+        return author_hits * 0.5 + media_hits * 0.3 + keyword_hits * 0.2
+    
+    def blacklist_keyword_hits(self, items: List[Dict]) -> List[bool]:
+        """是否命中关键词黑名单（有特征存储时按文章和黑名单内容只扫描一次）"""
         
-        # 检查媒体黑名单
-        source = item.get("source", "")
-        if source in blacklists["media"]:
-            penalty += 0.3
+        matcher, group = self.snapshot.derived("blacklist_matcher", self.build_blacklist_matcher)
         
-        # 检查关键词黑名单
-        content_text = f"{item.get('title', '')} {item.get('content', '')}"
-        for keyword in blacklists["keywords"]:
-            if keyword in content_text:
-                penalty += 0.2
-                break
+        def scan(batch: List[Dict]) -> List[Dict]:
+            return [
+                {"hit": matcher.contains_any(f"{item.get('title', '')} {item.get('content', '')}")}
+                for item in batch
+            ]
         
-        return penalty
+        if self.feature_store:
+            features = self.feature_store.lookup(items, group, scan)
+        else:
+            features = scan(items)
+        return [feature["hit"] for feature in features]
+    
+    def get_blacklist_matcher(self) -> KeywordAutomaton:
+        """关键词黑名单自动机（每个画像版本构建一次）"""
+        return self.snapshot.derived("blacklist_matcher", self.build_blacklist_matcher)[0]
+    
+    @staticmethod
+    def build_blacklist_matcher(snapshot: ProfileSnapshot) -> Tuple[KeywordAutomaton, str]:
+        """构建黑名单自动机及其特征组名"""
+        keywords = snapshot["preferences"]["blacklists"]["keywords"]
+        return KeywordAutomaton(keywords), keyword_group("blacklist", keywords)
     
     def deepseek_adjustment(self, item: Dict, base_score: float) -> float:
         """使用DeepSeek进行最终评分调整"""
         
+        if not self.llm_available():
+            return base_score
+        
         # 构建提示词
         user_prefs_summary = self.summarize_user_preferences()
         
@@ -277,7 +393,6 @@ class RecommendationEngine:
         
         # 尝试从响应中提取分数
         try:
-            import re
             # 查找0-1之间的分数
             score_match = re.search(r'(\d+\.?\d*)\s*(分|/|score)', response, re.IGNORECASE)
             if score_match:
@@ -296,54 +411,121 @@ class RecommendationEngine:
         
         return base_score
     
+    def listwise_rerank(self, scored_items: List[Dict]) -> List[Dict]:
+        """用一次DeepSeek调用重排本地top-K候选"""
+        
+        shortlist = scored_items[:self.rerank_top_k]
+        if len(shortlist) < 2 or not self.llm_available():
+            return scored_items
+        
+        items_text = ""
+        for i, item in enumerate(shortlist, 1):
+            items_text += f"{i}. 标题：{item.get('title', '无标题')}\n"
+            items_text += f"   话题：{', '.join(item.get('tags', ['未分类']))}\n"
+            items_text += f"   质量分数：{item.get('quality_score', 0.5):.2%}\n"
+            items_text += f"   基础推荐分：{item['recommendation_score']:.2%}\n"
+        
+        prompt = f"""基于用户历史偏好，对以下候选内容按推荐优先级从高到低排序：
+
+用户偏好摘要：
+{self.summarize_user_preferences()}
+
+候选内容：
+{items_text}
+请只输出排序后的编号列表，例如：[3, 1, 2]"""
+        
+        response = self.deepseek.call_api(
+            prompt,
+            system_prompt="你是一个推荐系统专家，擅长评估内容与用户偏好的匹配度。",
+            temperature=0.2,
+            max_tokens=100
+        )
+        
+        order = self.parse_rerank_order(response, len(shortlist))
+        if not order:
+            return scored_items
+        
+        # 排名分与基础分加权（与逐条模式的0.7/0.3一致）
+        for rank, index in enumerate(order):
+            item = shortlist[index]
+            rank_score = 1 - rank / len(order)
+            item["recommendation_score"] = item["recommendation_score"] * 0.7 + rank_score * 0.3
+        
+        shortlist.sort(key=lambda x: x["recommendation_score"], reverse=True)
+        return shortlist + scored_items[self.rerank_top_k:]
+    
+    def llm_available(self) -> bool:
+        """DeepSeek是否可用（熔断打开时返回False）"""
+        is_available = getattr(self.deepseek, "is_available", None)
+        return is_available() if is_available else True
+    
+    def parse_rerank_order(self, response: Optional[str], count: int) -> List[int]:
+        """解析重排结果，返回0起始的下标顺序"""
+        
+        if not response:
+            return []
+        
+        order = []
+        for match in re.findall(r'\d+', response):
+            index = int(match) - 1
+            if 0 <= index < count and index not in order:
+                order.append(index)
+        
+        if not order:
+            return []
+        
+        # 未被提及的候选按原顺序补在末尾
+        order.extend(i for i in range(count) if i not in order)
+        return order
+    
     def summarize_user_preferences(self) -> str:
-        """总结用户偏好"""
+        """总结用户偏好（每个画像版本生成一次）"""
+        return self.snapshot.derived("preference_summary", self.build_preference_summary)
+    
+    @staticmethod
+    def sorted_topic_weights(snapshot: ProfileSnapshot) -> List[Tuple[str, float]]:
+        """按权重降序排列的话题"""
+        return sorted(snapshot["preferences"]["topic_weights"].items(), key=lambda kv: kv[1], reverse=True)
+    
+    def build_preference_summary(self, snapshot: ProfileSnapshot) -> str:
+        """生成偏好摘要"""
         
-        prefs = self.user_profile["preferences"]
+        topics = snapshot.derived("sorted_topic_weights", self.sorted_topic_weights)
+        satisfaction = snapshot.get("feedback_stats", {}).get("satisfaction_rate", 0.0)
         
-        summary = f"""用户画像：爱国键盘侠
-最喜欢的话题：{', '.join([k for k, v in prefs['topic_weights'].items() if v > 0.8])}
-最讨厌的话题：{', '.join([k for k, v in prefs['topic_weights'].items() if v < 0.2])}
+        return f"""用户画像：{snapshot.get('profile_name', '爱国键盘侠')}
+最喜欢的话题：{', '.join([k for k, v in topics if v > 0.8])}
+最讨厌的话题：{', '.join([k for k, v in reversed(topics) if v < 0.2])}
 风格偏好：理性冷静、爱国情怀强、喜欢宏大叙事
 情感倾向：积极正面，厌恶负面情绪
-近期满意度：{self.user_profile['feedback_stats']['satisfaction_rate']:.1%}"""
-        
-        return summary
+近期满意度：{satisfaction:.1%}"""
     
     def select_with_diversity(self, scored_items: List[Dict], count: int) -> List[Dict]:
-        """考虑多样性的选择"""
+        """考虑多样性的选择（MMR，同一ID只选一次）"""
         
-        if len(scored_items) <= count:
-            return scored_items
+        # 按ID去重（同一内容可能被多个来源收录）
+        candidates = []
+        seen_ids = set()
+        for item in scored_items:
+            item_id = item.get("id", id(item))
+            if item_id not in seen_ids:
+                seen_ids.add(item_id)
+                candidates.append(item)
         
-        selected = []
-        selected_topics = set()
+        if len(candidates) <= count:
+            return candidates
         
-        for item in scored_items:
-            if len(selected) >= count:
-                break
-            
-            item_topics = set(item.get("tags", []))
-            
-            # 检查话题多样性
-            if not selected_topics.intersection(item_topics):
-                # 新话题，优先选择
-                selected.append(item)
-                selected_topics.update(item_topics)
-            elif len(selected) < count * 0.7:
-                # 允许部分重复话题
-                selected.append(item)
-            # 否则跳过，避免同质化
-        
-        # 如果选择不足，补充高分内容
-        if len(selected) < count:
-            for item in scored_items:
-                if item not in selected:
-                    selected.append(item)
-                if len(selected) >= count:
-                    break
-        
-        return selected[:count]
+        relevance = np.array([item.get("recommendation_score", 0) for item in candidates], dtype=float)
+        order = mmr_select(relevance, self.similarity_matrix(candidates), count, self.diversity_lambda)
+        return [candidates[index] for index in order]
+    
+    def similarity_matrix(self, items: List[Dict]) -> np.ndarray:
+        """候选两两相似度：有向量索引时用余弦相似度，否则用标签Jaccard"""
+        
+        if self.embedding_index:
+            return cosine_matrix(self.embedding_index.embeddings(items))
+        
+        return tag_jaccard_matrix([item.get("tags", []) for item in items])
     
     def record_recommendation(self, items: List[Dict], time_of_day: str):
         """记录推荐历史"""
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# 两级重写缓存
+
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class RewriteCache:
+    """两级重写缓存
+
+    第一级是进程内LRU，第二级是单文件SQLite存储。
+    条目按写入时间过期（TTL），超过容量时淘汰最久未访问的条目，
+    后台线程定期清理过期条目。
+    """
+
+    def __init__(self,
+                 db_path: str = "./cache/rewrite_cache.db",
+                 ttl_hours: float = 24,
+                 max_entries: int = 10000,
+                 memory_entries: int = 512,
+                 purge_interval: float = 3600):
+        """
+        Args:
+            db_path: SQLite文件路径
+            ttl_hours: 条目有效期（小时）
+            max_entries: 持久化存储的最大条目数
+            memory_entries: 进程内LRU的最大条目数
+            purge_interval: 后台清理过期条目的间隔（秒），0表示不启动后台线程
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()  # key -> (content, created_at)
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evicted": 0,
+            "purged": 0
+        }
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rewrites ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_rewrites_accessed ON rewrites(accessed_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_rewrites_created ON rewrites(created_at)")
+        self.conn.commit()
+        self.entry_count = self.conn.execute("SELECT COUNT(*) FROM rewrites").fetchone()[0]
+
+        self.stop_event = threading.Event()
+        self.purge_thread = None
+        if purge_interval > 0:
+            self.purge_thread = threading.Thread(
+                target=self.purge_loop, args=(purge_interval,), name="rewrite-cache-purge", daemon=True
+            )
+            self.purge_thread.start()
+
+    def get(self, key: str) -> Optional[str]:
+        """查找重写结果：先查LRU，再查SQLite"""
+        now = time.time()
+
+        with self.lock:
+            cached = self.memory.get(key)
+            if cached is not None:
+                content, created_at = cached
+                if now - created_at < self.ttl_seconds:
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return content
+                del self.memory[key]
+
+            row = self.conn.execute(
+                "SELECT content, created_at FROM rewrites WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            content, created_at = row
+            if now - created_at >= self.ttl_seconds:
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self.conn.execute("UPDATE rewrites SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.remember(key, content, created_at)
+            self.stats["disk_hits"] += 1
+            return content
+
+    def put(self, key: str, content: str):
+        """保存重写结果"""
+        now = time.time()
+
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO rewrites (key, content, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, content, now, now)
+            )
+            if cursor.rowcount == 1:
+                self.entry_count += 1
+            else:
+                self.conn.execute(
+                    "UPDATE rewrites SET content = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (content, now, now, key)
+                )
+
+            # 超出容量时淘汰最久未访问的条目
+            excess = self.entry_count - self.max_entries
+            if excess > 0:
+                evicted = self.conn.execute(
+                    "SELECT key FROM rewrites ORDER BY accessed_at LIMIT ?", (excess,)
+                ).fetchall()
+                self.conn.executemany("DELETE FROM rewrites WHERE key = ?", evicted)
+                for (evicted_key,) in evicted:
+                    self.memory.pop(evicted_key, None)
+                self.entry_count -= len(evicted)
+                self.stats["evicted"] += len(evicted)
+
+            self.conn.commit()
+            self.remember(key, content, now)
+
+    def remember(self, key: str, content: str, created_at: float):
+        """放入进程内LRU（调用方持有锁）"""
+        self.memory[key] = (content, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """清理过期条目，返回清理数量"""
+        cutoff = time.time() - self.ttl_seconds
+
+        with self.lock:
+            purged = self.conn.execute("DELETE FROM rewrites WHERE created_at < ?", (cutoff,)).rowcount
+            self.conn.commit()
+            self.entry_count -= purged
+            self.stats["purged"] += purged
+
+            for key in [k for k, (_, created_at) in self.memory.items() if created_at < cutoff]:
+                del self.memory[key]
+
+        return purged
+
+    def purge_loop(self, interval: float):
+        """后台定期清理"""
+        while not self.stop_event.wait(interval):
+            try:
+                self.purge_expired()
+            except sqlite3.Error as e:
+                print(f"重写缓存清理失败: {e}")
+
+    def close(self):
+        """停止后台线程并关闭数据库"""
+        self.stop_event.set()
+        if self.purge_thread:
+            self.purge_thread.join(timeout=1)
+        with self.lock:
+            self.conn.close()
+
+    def get_stats(self) -> Dict:
+        """获取命中率统计"""
+        with self.lock:
+            stats = self.stats.copy()
+            stats["entries"] = self.entry_count
+            stats["memory_entries"] = len(self.memory)
+
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        stats["memory_hit_ratio"] = stats["memory_hits"] / lookups if lookups else 0.0
+        return stats
@@ -127,14 +127,11 @@ class DailyScheduler:
                 # 初始化处理器
                 processor = ContentProcessor(self.deepseek, "config/system_config.yaml")
                 
-                # 处理文章
-                processed_articles = []
-                for article in articles[:10]:  # 处理前10篇
-                    processed = processor.process_content_item(article)
-                    if processed:
-                        processed_articles.append(processed)
+                # 处理文章（前10篇，批量并发处理）
+                processed_articles = [item for item in processor.process_batch(articles[:10]) if item]
                 
                 self.log_message(f"内容处理完成: {len(processed_articles)}/{len(articles)}篇文章通过处理")
+                self.log_message(f"各阶段耗时: {processor.get_stats()['stage_seconds']}")
                 
                 # 3. 生成简报（示例）
                 if processed_articles:
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# 预编译正则注册表
+
+import re
+from typing import Dict
+
+# 标题党特征词及权重（与原有规则一致：每命中一个特征 +0.1）
+CLICKBAIT_WEIGHTS = {
+    "震惊": 0.1,
+    "惊呆": 0.1,
+    "吓尿": 0.1,
+    "重磅": 0.1,
+    "突发": 0.1,
+    "速看": 0.1,
+    "竟然": 0.1,
+    "原来": 0.1,
+    "真相": 0.1,
+    "秘密": 0.1
+}
+
+# 所有特征词合成一个交替正则；零宽前瞻使相互重叠的特征词也都能命中
+CLICKBAIT_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(term) for term in sorted(CLICKBAIT_WEIGHTS, key=len, reverse=True)) + "))"
+)
+
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # 表情符号
+    "\U0001F300-\U0001F5FF"  # 符号和象形文字
+    "\U0001F680-\U0001F6FF"  # 交通和地图符号
+    "\U0001F1E0-\U0001F1FF"  # 国旗
+    "]+",
+    flags=re.UNICODE
+)
+
+PATTERNS: Dict[str, re.Pattern] = {
+    "clickbait": CLICKBAIT_PATTERN,
+    "emoji": EMOJI_PATTERN
+}
+
+
+def clickbait_terms(title: str) -> set:
+    """标题中出现的标题党特征词"""
+    return set(CLICKBAIT_PATTERN.findall(title))
+
+
+def clickbait_score(title: str) -> float:
+    """标题党分数：命中特征词的权重之和，上限1.0"""
+    found = clickbait_terms(title)
+    return min(1.0, sum(weight for term, weight in CLICKBAIT_WEIGHTS.items() if term in found))
+
+
+def emoji_count(text: str) -> int:
+    """emoji片段数（连续emoji计为一段）"""
+    return len(EMOJI_PATTERN.findall(text))
+
+
+def emoji_density(text: str) -> float:
+    """emoji密度"""
+    return emoji_count(text) / max(1, len(text))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# 发布时间归一化
+
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Union
+
+NUMERIC_PATTERN = re.compile(r"^\d+(\.\d+)?$")
+# RFC 822 / RFC 2822（RSS的published字段），如 "Tue, 10 Jun 2025 08:30:00 GMT"
+RFC822_PATTERN = re.compile(r"^(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s")
+
+# fromisoformat无法处理时的兜底格式
+FALLBACK_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d",
+    "%Y年%m月%d日 %H:%M",
+    "%Y年%m月%d日"
+)
+
+
+def parse_timestamp(value: Union[str, int, float, datetime, None]) -> Optional[float]:
+    """把发布时间解析为epoch秒，无法解析时返回None
+
+    支持：epoch秒/毫秒（数字或数字字符串）、ISO 8601（含Z和时区偏移，
+    即gnews的publishedAt）、RFC 822（RSS的published）以及常见的本地格式。
+    不带时区的时间按本地时间处理。
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return normalize_epoch(float(value))
+    if isinstance(value, str):
+        return parse_timestamp_string(value.strip())
+    return None
+
+
+def normalize_epoch(seconds: float) -> float:
+    """毫秒时间戳转为秒"""
+    return seconds / 1000.0 if seconds > 1e11 else seconds
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp_string(text: str) -> Optional[float]:
+    """解析时间字符串（同一来源的时间格式高度重复，结果缓存）"""
+    if not text:
+        return None
+
+    if NUMERIC_PATTERN.match(text):
+        return normalize_epoch(float(text))
+
+    if RFC822_PATTERN.match(text):
+        try:
+            return parsedate_to_datetime(text).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+    iso_text = text[:-1] + "+00:00" if text.endswith(("Z", "z")) else text
+    try:
+        return datetime.fromisoformat(iso_text).timestamp()
+    except ValueError:
+        pass
+
+    for fmt in FALLBACK_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+
+    return None
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# 句子级翻译记忆
+
+import os
+import re
+import json
+import hashlib
+import threading
+import unicodedata
+from typing import Dict, Optional
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sentence(sentence: str) -> str:
+    """归一化句子：全半角统一、合并空白、转小写"""
+    text = unicodedata.normalize("NFKC", sentence)
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+
+class TranslationMemory:
+    """句子级翻译记忆
+
+    以“目标语言 + 归一化句子”的哈希为键保存译文，持久化为单个JSON文件。
+    同一条通讯稿被Reuters、AP、Hacker News转载时，重复的句子直接复用译文。
+    """
+
+    def __init__(self, memory_path: str = "./cache/translation_memory.json", max_entries: int = 50000):
+        self.memory_path = memory_path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = self.load_memory()
+        self.dirty = False
+        self.run_stats = {"hits": 0, "misses": 0}
+        self.total_stats = {"hits": 0, "misses": 0}
+
+    def load_memory(self) -> Dict[str, str]:
+        """加载翻译记忆"""
+        if os.path.exists(self.memory_path):
+            try:
+                with open(self.memory_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"翻译记忆加载失败，重新建立: {e}")
+        return {}
+
+    def save(self):
+        """保存翻译记忆（有新条目时才写盘）"""
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = dict(self.entries)
+            self.dirty = False
+
+        directory = os.path.dirname(self.memory_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.memory_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.memory_path)
+
+    def make_key(self, sentence: str, target_lang: str) -> str:
+        """生成句子键"""
+        normalized = normalize_sentence(sentence)
+        return hashlib.sha1(f"{target_lang}\x00{normalized}".encode('utf-8')).hexdigest()[:20]
+
+    def lookup(self, sentence: str, target_lang: str) -> Optional[str]:
+        """查找译文，命中返回译文"""
+        return self.get(self.make_key(sentence, target_lang))
+
+    def store(self, sentence: str, target_lang: str, translation: str):
+        """保存译文"""
+        self.put(self.make_key(sentence, target_lang), translation)
+
+    def get(self, key: str) -> Optional[str]:
+        """按键查找译文（计入命中率）"""
+        with self.lock:
+            translation = self.entries.get(key)
+            counter = "hits" if translation is not None else "misses"
+            self.run_stats[counter] += 1
+            self.total_stats[counter] += 1
+        return translation
+
+    def put(self, key: str, translation: str):
+        """按键保存译文"""
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = translation
+            self.dirty = True
+
+            # 超出容量时淘汰最早写入的条目
+            while len(self.entries) > self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+
+    def begin_run(self):
+        """开始新一轮统计"""
+        with self.lock:
+            self.run_stats = {"hits": 0, "misses": 0}
+
+    def get_stats(self) -> Dict:
+        """获取命中率统计（本轮和累计）"""
+        with self.lock:
+            run_total = self.run_stats["hits"] + self.run_stats["misses"]
+            total = self.total_stats["hits"] + self.total_stats["misses"]
+            return {
+                "entries": len(self.entries),
+                "run_hits": self.run_stats["hits"],
+                "run_misses": self.run_stats["misses"],
+                "run_hit_rate": self.run_stats["hits"] / run_total if run_total else 0.0,
+                "total_hit_rate": self.total_stats["hits"] / total if total else 0.0
+            }
@@ -0,0 +1,196 @@
+"""
+批量向量化评分测试
+"""
+
+import os
+import sys
+import random
+
+import numpy as np
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.recommendation_engine import RecommendationEngine
+from src.batch_scoring import quality_scores
+
+PROFILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'user_profile.json')
+
+
+def legacy_quality_score(analysis, was_rewritten):
+    """原有逐条实现"""
+    scores = {
+        "爱国程度": analysis.get("patriotic_level", 0.5) * 0.3,
+        "科技相关性": analysis.get("tech_relevance", 0.5) * 0.25,
+        "正式程度": analysis.get("formality", 0.5) * 0.2,
+        "情感正向": max(0, analysis.get("sentiment_score", 0)) * 0.15,
+        "标题党惩罚": (1 - analysis.get("clickbait_score", 0)) * 0.1
+    }
+    total_score = sum(scores.values())
+    if was_rewritten:
+        total_score = min(1.0, total_score * 1.1)
+    return total_score
+
+
+def legacy_score(engine, item, time_of_day):
+    """原有逐条实现：分数字典 × 权重字典"""
+    scores = {
+        "topic_score": engine.calculate_topic_score(item),
+        "style_score": engine.calculate_style_score(item),
+        "source_score": engine.calculate_source_score(item),
+        "time_score": engine.calculate_time_score(item, time_of_day),
+        "freshness_score": engine.calculate_freshness_score(item),
+        "quality_score": item.get("quality_score", 0.5),
+        "blacklist_penalty": engine.calculate_blacklist_penalty(item)
+    }
+    weights = {
+        "topic_score": 0.35, "style_score": 0.20, "source_score": 0.15, "time_score": 0.10,
+        "freshness_score": 0.05, "quality_score": 0.15, "blacklist_penalty": -0.1
+    }
+    total_score = 0
+    for key in scores:
+        total_score += scores[key] * weights[key]
+    return max(0, min(1, total_score))
+
+
+def random_items(count, seed=7):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        style = {} if rng.random() < 0.3 else {
+            "patriotic_level": rng.random(),
+            "formality": rng.random(),
+            "sentiment_score": rng.uniform(-1, 1)
+        }
+        items.append({
+            "id": f"item_{i}",
+            "title": rng.choice(["国产芯片突破", "经济数据发布", "文艺小确幸", "航天新进展"]),
+            "content": "内容",
+            "source": rng.choice(["人民日报", "科技日报", "清华大学", "某自媒体"]),
+            "type": rng.choice(["tech", "politics", "economy", "social"]),
+            "tags": rng.sample(["科技", "爱国", "成就", "经济"], rng.randint(0, 2)),
+            "original_style": style,
+            "quality_score": rng.random()
+        })
+    return items
+
+
+def test_batch_scores_match_legacy_path():
+    """测试批量评分与逐条评分一致"""
+    engine = RecommendationEngine(PROFILE_PATH, None, rerank_mode="none")
+    items = random_items(300)
+
+    batch = engine.score_batch(items, "morning")
+    legacy = np.array([legacy_score(engine, item, "morning") for item in items])
+
+    assert np.allclose(batch, legacy, rtol=0, atol=1e-12)
+
+    print("✅ 批量评分一致性测试通过")
+
+
+def test_quality_scores_match_legacy_path():
+    """测试批量质量分与逐条计算一致"""
+    rng = random.Random(3)
+    analyses = [
+        {"patriotic_level": rng.random(), "tech_relevance": rng.random(), "formality": rng.random(),
+         "sentiment_score": rng.uniform(-1, 1), "clickbait_score": rng.random()}
+        for _ in range(200)
+    ] + [{}]
+    rewritten = [rng.random() < 0.5 for _ in analyses]
+
+    batch = quality_scores(analyses, rewritten)
+    legacy = np.array([legacy_quality_score(a, r) for a, r in zip(analyses, rewritten)])
+
+    assert np.allclose(batch, legacy, rtol=0, atol=1e-12)
+
+    print("✅ 批量质量分测试通过")
+
+
+def test_timestamp_formats_normalise_to_epoch():
+    """测试ISO、RFC 822、gnews publishedAt和数字时间戳解析为同一时刻"""
+    from src.timestamps import parse_timestamp
+
+    expected = 1749544200.0  # 2025-06-10T08:30:00Z
+    for value in ["2025-06-10T08:30:00Z", "2025-06-10T16:30:00+08:00",
+                  "Tue, 10 Jun 2025 08:30:00 GMT", "Tue, 10 Jun 2025 08:30:00 +0000",
+                  expected, int(expected * 1000), "1749544200"]:
+        assert parse_timestamp(value) == expected, value
+
+    assert parse_timestamp("不是时间") is None
+    assert parse_timestamp(None) is None
+
+    print("✅ 时间格式解析测试通过")
+
+
+def test_freshness_decays_continuously():
+    """测试新鲜度按半衰期连续衰减，未知时间为0.5"""
+    engine = RecommendationEngine(PROFILE_PATH, None, rerank_mode="none", freshness_half_life_hours=48, freshness_floor=0.2)
+    now = 1749544200.0
+    items = [
+        {"publish_ts": now},
+        {"publish_ts": now - 48 * 3600},
+        {"publish_time": "Sat, 07 Jun 2025 08:30:00 GMT"},
+        {"publish_time": "无法解析"},
+        {}
+    ]
+
+    scores = engine.calculate_freshness_scores(items, now=now)
+
+    assert np.allclose(scores, [1.0, 0.6, 0.2 + 0.8 * 0.5 ** 1.5, 0.5, 0.5])
+    assert items[2]["publish_ts"] == now - 72 * 3600
+
+    print("✅ 新鲜度衰减测试通过")
+
+
+def test_top_k_matches_stable_sort_prefix():
+    """测试部分选择与稳定全量排序的前k个一致（含同分）"""
+    from src.batch_scoring import top_k_indices
+
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 20, size=5000).astype(float)
+
+    for k in [1, 3, 50, 5000]:
+        assert list(top_k_indices(scores, k)) == list(np.argsort(-scores, kind="stable")[:k])
+
+    print("✅ Top-K选择测试通过")
+
+
+def test_diversity_prefers_new_topics_and_dedupes_ids():
+    """测试MMR选择避开同话题内容，且同一ID只选一次"""
+    engine = RecommendationEngine(PROFILE_PATH, None, rerank_mode="none", diversity_lambda=0.5,
+                                  embedding_config={"enabled": False})
+    candidates = [
+        {"id": "a", "tags": ["科技"], "recommendation_score": 0.9},
+        {"id": "a", "tags": ["科技"], "recommendation_score": 0.9},
+        {"id": "b", "tags": ["科技"], "recommendation_score": 0.85},
+        {"id": "c", "tags": ["经济"], "recommendation_score": 0.7},
+        {"id": "d", "tags": ["爱国"], "recommendation_score": 0.6},
+    ]
+
+    selected = engine.select_with_diversity(candidates, 3)
+
+    assert [item["id"] for item in selected] == ["a", "c", "d"]
+
+    print("✅ 多样性选择测试通过")
+
+
+def test_topic_scores_from_prototype_similarity():
+    """测试没有已知标签的文章按最接近的话题原型打分"""
+    engine = RecommendationEngine(PROFILE_PATH, None, rerank_mode="none")
+    items = [
+        {"title": "国产芯片研发取得突破", "content": "人工智能芯片技术实现自主创新", "tags": ["科技"]},
+        {"title": "周末小确幸", "content": "一杯咖啡和花草的慢生活，文艺又治愈", "tags": []},
+        {"title": "xyz", "content": "qwerty", "tags": []},
+        {"title": "", "content": "", "tags": ["科技进展"]}
+    ]
+
+    engine.index_items(items)
+    scores = engine.calculate_topic_scores(items)
+
+    assert scores[0] > 0.7
+    assert scores[1] < 0.3
+    assert scores[2] == 0.5
+    assert scores[3] == 0.90
+    assert engine.index_items(items) == 0
+
+    print("✅ 话题原型相似度测试通过")
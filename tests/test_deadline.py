@@ -0,0 +1,79 @@
+"""
+截止时间与对冲请求测试
+"""
+
+import os
+import sys
+import time
+import threading
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.deadline import Deadline, deadline_scope
+from src.deepseek_client import DeepSeekClient
+from src.llm_backend import LLMBackend
+
+
+class RecordingBackend(LLMBackend):
+    """记录超时参数；第slow_call次调用耗时slow_seconds"""
+
+    name = "recording"
+
+    def __init__(self, slow_call=None, slow_seconds=0.5):
+        super().__init__("test")
+        self.timeouts = []
+        self.calls = 0
+        self.slow_call = slow_call
+        self.slow_seconds = slow_seconds
+        self.lock = threading.Lock()
+
+    def chat(self, messages, temperature=0.3, max_tokens=2000, timeout=30):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+            self.timeouts.append(timeout)
+        if call == self.slow_call:
+            time.sleep(self.slow_seconds)
+        else:
+            time.sleep(0.01)
+        return {
+            "choices": [{"message": {"content": f"回复{call}"}}],
+            "usage": {"total_tokens": 1}
+        }
+
+
+def test_deadline_shrinks_timeout():
+    """测试剩余时间收紧单次调用超时，超时后不再调用"""
+    backend = RecordingBackend()
+    client = DeepSeekClient(backend=backend, timeout=30)
+
+    with deadline_scope(Deadline(5)):
+        assert client.call_api("你好") is not None
+    assert backend.timeouts[0] <= 5
+
+    with deadline_scope(Deadline(0.5)):
+        assert client.call_api("你好") is None
+    assert backend.calls == 1
+    assert client.get_usage_stats()["deadline_skips"] == 1
+
+    print("✅ 截止时间测试通过")
+
+
+def test_hedged_request_wins_over_slow_call():
+    """测试慢请求超过p95后发出对冲请求并采用先返回的结果"""
+    backend = RecordingBackend(slow_call=6, slow_seconds=1.0)
+    client = DeepSeekClient(backend=backend, hedge_config={"enabled": True, "min_samples": 5})
+
+    for _ in range(5):
+        client.call_api("预热")
+
+    start = time.monotonic()
+    assert client.call_api("你好") == "回复7"
+    assert time.monotonic() - start < 0.5
+
+    stats = client.get_usage_stats()
+    assert stats["hedged_requests"] == 1
+    assert stats["hedge_wins"] == 1
+
+    print("✅ 对冲请求测试通过")
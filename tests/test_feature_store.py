@@ -0,0 +1,60 @@
+"""
+文章特征存储测试
+"""
+
+import os
+import sys
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.article_features import ArticleFeatureStore, infer_content_type, classify_source
+
+
+def make_items():
+    return [
+        {"title": "量子计算取得突破", "content": "研究团队发布新一代量子芯片。", "source": "新华社"},
+        {"title": "经济数据：股市今日收涨", "content": "沪深两市成交额放大，市场情绪回暖。", "source": "某财经网"},
+    ]
+
+
+def test_features_computed_once_and_persisted(tmp_path):
+    """测试同一批文章第二次查询不再计算，重新打开后从SQLite读取"""
+    db_path = str(tmp_path / "features.db")
+    calls = []
+
+    def compute(batch):
+        calls.append(len(batch))
+        return [{"length": len(item["content"])} for item in batch]
+
+    store = ArticleFeatureStore(db_path)
+    items = make_items()
+    first = store.lookup(items, "length", compute)
+    second = store.lookup(make_items(), "length", compute)
+    assert first == second
+    assert calls == [2]
+    assert store.get_stats()["memory_hits"] == 2
+    store.close()
+
+    reopened = ArticleFeatureStore(db_path)
+    assert reopened.lookup(make_items(), "length", compute) == first
+    assert calls == [2]
+    assert reopened.get_stats()["disk_hits"] == 2
+    reopened.close()
+
+    print("✅ 特征存储测试通过")
+
+
+def test_text_features():
+    """测试基础文本特征与分类规则一致"""
+    store = ArticleFeatureStore(db_path=None)
+    items = make_items()
+    features = store.text_features(items)
+
+    assert [f["content_type"] for f in features] == ["tech", "economy"]
+    assert [f["source_type"] for f in features] == ["official_media", "mainstream_media"]
+    assert infer_content_type("今日热搜", "微博") == "social"
+    assert classify_source("清华大学") == "academic"
+    assert all("content_key" in item for item in items)
+
+    print("✅ 文本特征测试通过")
@@ -0,0 +1,40 @@
+"""
+关键词自动机测试
+"""
+
+import os
+import sys
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.keyword_matcher import KeywordAutomaton, labelled_automaton
+
+
+def test_finds_overlapping_keywords_in_one_pass():
+    """测试一次扫描找出所有（包括重叠的）命中"""
+    matcher = KeywordAutomaton(["he", "she", "his", "hers", "网传", "传言"])
+
+    assert matcher.find_all("ushers") == {"he", "she", "hers"}
+    assert matcher.find_all("据网传言") == {"网传", "传言"}
+    assert matcher.first("据网传言") == "网传"
+    assert not matcher.contains_any("官方发布")
+
+    print("✅ 多模式匹配测试通过")
+
+
+def test_labelled_counts_match_substring_checks():
+    """测试按标签统计与逐个关键词检查结果一致"""
+    groups = {
+        "科技": ["科技", "技术", "人工智能"],
+        "爱国": ["中国", "国家"],
+        "成就": ["突破", "成就"]
+    }
+    matcher = labelled_automaton(groups)
+    text = "中国人工智能技术取得突破，国家科技成就显著"
+
+    expected = {label: sum(text.count(word) for word in words) for label, words in groups.items()}
+    assert matcher.count_labels(text) == expected
+    assert matcher.find_labels("没有命中") == set()
+
+    print("✅ 标签统计测试通过")
@@ -0,0 +1,77 @@
+"""
+LLM后端与本地替身服务测试
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.deepseek_client import DeepSeekClient
+from src.llm_backend import LLMBackendError, OpenAICompatibleBackend, StandInBackend
+from src.local_llm_server import LocalLLMServer
+
+
+def test_client_over_local_server():
+    """测试客户端通过HTTP访问本地替身服务"""
+    with LocalLLMServer(latency_ms=5) as server:
+        client = DeepSeekClient(api_key="local", base_url=server.base_url)
+
+        analysis = client.analyze_content("我国在人工智能领域取得重要突破。")
+        assert analysis["recommended_action"] == "keep"
+
+        stats = client.get_usage_stats()
+        assert stats["request_count"] == 1
+        assert stats["total_tokens"] > 0
+        assert server.simulator.get_stats()["completed"] == 1
+
+    print("✅ 本地替身服务测试通过")
+
+
+def test_local_server_rate_limit():
+    """测试替身服务超出速率时返回429和Retry-After"""
+    with LocalLLMServer(rate_limit_rps=0.5, rate_limit_burst=1) as server:
+        backend = OpenAICompatibleBackend(server.base_url, "local")
+        messages = [{"role": "user", "content": "你好"}]
+
+        backend.chat(messages)
+        with pytest.raises(LLMBackendError) as excinfo:
+            backend.chat(messages)
+
+        assert excinfo.value.status_code == 429
+        assert excinfo.value.retry_after is not None and excinfo.value.retry_after > 0
+
+    print("✅ 限流测试通过")
+
+
+def test_stand_in_backend_without_api_key():
+    """测试进程内替身后端无需API密钥"""
+    client = DeepSeekClient(backend=StandInBackend())
+    order = client.call_api("对以下候选内容排序：\n1. 标题：a\n2. 标题：b")
+
+    assert json.loads(order) == [1, 2]
+
+    print("✅ 进程内替身后端测试通过")
+
+
+def test_circuit_breaker_fast_fails():
+    """测试连续失败后熔断，后续调用快速失败"""
+    client = DeepSeekClient(
+        backend=StandInBackend(error_rate=1.0, latency_ms=0),
+        breaker_config={"failure_threshold": 2, "recovery_timeout": 60, "backoff_base": 0}
+    )
+
+    assert client.call_api("你好") is None
+    assert not client.is_available()
+
+    assert client.call_api("你好") is None
+    stats = client.get_usage_stats()
+    # 第一次调用的第3次重试和第二次调用都被熔断拦截
+    assert stats["fast_failures"] == 2
+    assert stats["circuit_breaker"]["state"] == "open"
+
+    print("✅ 熔断测试通过")
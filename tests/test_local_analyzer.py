@@ -0,0 +1,109 @@
+"""
+本地内容分析器测试
+"""
+
+import os
+import sys
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.local_analyzer import LocalContentAnalyzer
+from src.content_processor import ContentProcessor
+
+
+class CountingClient:
+    """记录调用次数的DeepSeek替身"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_content(self, text):
+        self.calls += 1
+        return {
+            "sentiment_score": 0.5,
+            "sensationalism": 0.1,
+            "recommended_action": "keep"
+        }
+
+
+TEST_ITEMS = [
+    {"title": "中国科技取得新进展", "content": "近日，我国在人工智能领域取得重要突破，相关技术达到国际领先水平。", "source": "测试"},
+    {"title": "某公司陷入危机", "content": "受市场下滑影响，公司亏损扩大并宣布裁员，投资者担忧情绪蔓延。", "source": "测试"},
+]
+
+
+def test_analyze_batch_fields():
+    """测试批量分析输出字段"""
+    analyzer = LocalContentAnalyzer()
+    results = analyzer.analyze_batch(TEST_ITEMS)
+
+    assert len(results) == len(TEST_ITEMS)
+    for result in results:
+        for field in ["sentiment_score", "patriotic_level", "tech_relevance", "formality",
+                      "sensationalism", "clickbait_score", "recommended_action", "uncertain"]:
+            assert field in result
+
+    assert results[0]["recommended_action"] == "keep"
+    assert results[0]["tech_relevance"] > 0.5
+    assert results[1]["recommended_action"] == "filter"
+
+    print("✅ 批量分析测试通过")
+
+
+def test_clickbait_rule_matches_legacy():
+    """测试标题党分数与原有规则一致"""
+    analyzer = LocalContentAnalyzer()
+    result = analyzer.analyze({"title": "震惊！真相竟然是这样", "content": "内容"})
+
+    assert abs(result["clickbait_score"] - 0.3) < 1e-9
+
+    print("✅ 标题党规则测试通过")
+
+
+def test_processor_only_escalates_uncertain_items():
+    """测试只有不确定内容才调用LLM"""
+    client = CountingClient()
+    processor = ContentProcessor(client, "config/system_config.yaml")
+
+    borderline = {"title": "重磅突发速看：竟然原来如此", "content": "相关部门发布了最新的统计报告。", "source": "测试"}
+    analyses = processor.analyze_batch(TEST_ITEMS + [borderline])
+
+    assert len(analyses) == 3
+    assert client.calls == 1
+    assert processor.get_stats()["local_analyses"] == 2
+    assert processor.get_stats()["llm_analyses"] == 1
+
+    print("✅ LLM升级测试通过")
+
+
+def test_process_batch_keeps_input_order():
+    """测试批处理按输入顺序返回结果并记录各阶段耗时"""
+    processor = ContentProcessor(CountingClient(), "config/system_config.yaml")
+    items = [dict(item) for item in TEST_ITEMS] + [{"title": "空内容", "content": "", "source": "测试"}]
+
+    results = processor.process_batch(items)
+
+    assert len(results) == 3
+    assert results[0]["title"] == TEST_ITEMS[0]["title"]
+    assert "quality_score" in results[0]
+    assert results[1] is None and results[2] is None
+
+    stats = processor.get_stats()
+    assert stats["processed"] == 3
+    assert stats["passed"] == 1
+    assert stats["filtered"] == 2
+    assert set(stats["stage_seconds"]) == {"checks", "analysis", "rewrite", "finish"}
+
+    print("✅ 批处理测试通过")
+
+
+def test_clickbait_registry_counts_overlapping_terms():
+    """测试交替正则与逐个搜索一致（包括重叠的特征词）"""
+    from src.text_patterns import clickbait_score, emoji_density
+
+    assert abs(clickbait_score("震惊呆了，真相原来如此") - 0.4) < 1e-9
+    assert clickbait_score("普通标题") == 0
+    assert emoji_density("好🎉🎉") == 1 / 3
+
+    print("✅ 正则注册表测试通过")
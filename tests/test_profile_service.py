@@ -0,0 +1,66 @@
+"""
+用户画像服务测试
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.feedback_system import FeedbackSystem
+from src.profile_service import ProfileService
+from src.recommendation_engine import RecommendationEngine
+
+PROFILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'user_profile.json')
+
+
+def test_versioned_snapshots(tmp_path):
+    """测试文件未变化时不发布新版本，快照只读"""
+    service = ProfileService(PROFILE_PATH, model_path=str(tmp_path / "user_model.json"), check_interval=0)
+    snapshot = service.snapshot()
+
+    assert service.snapshot() is snapshot
+    assert service.reload() is False
+    with pytest.raises(TypeError):
+        snapshot["preferences"]["topic_weights"]["科技进展"] = 0.0
+
+    builds = []
+    snapshot.derived("topics", lambda s: builds.append(1) or len(s["preferences"]["topic_weights"]))
+    snapshot.derived("topics", lambda s: builds.append(1))
+    assert builds == [1]
+
+    print("✅ 画像快照测试通过")
+
+
+def test_feedback_reaches_recommender(tmp_path):
+    """测试反馈学习的模型合并进画像，推荐引擎按版本切换"""
+    data_dir = str(tmp_path)
+    service = ProfileService(PROFILE_PATH, model_path=os.path.join(data_dir, "user_model.json"), check_interval=0)
+    engine = RecommendationEngine(PROFILE_PATH, None, rerank_mode="none", profile_service=service)
+    feedback = FeedbackSystem("test_user", data_dir, profile_service=service)
+
+    version = engine.profile_version
+    before = engine.user_profile["preferences"]["topic_weights"]["科技进展"]
+    summary = engine.summarize_user_preferences()
+
+    feedback.record_feedback("msg_001", "content_001", "like", {"topics": ["科技进展"], "source": "人民日报"})
+
+    assert engine.refresh_profile() is True
+    assert engine.profile_version > version
+    assert engine.user_profile["preferences"]["topic_weights"]["科技进展"] == pytest.approx(min(1.0, before + 0.1))
+    assert engine.user_profile["preferences"]["learned_source_weights"]["人民日报"] > 0.5
+    # 派生结构按新版本重新生成
+    assert "preference_summary" not in engine.snapshot.cache
+    assert "近期满意度：100.0%" in engine.summarize_user_preferences()
+    assert "近期满意度：85.0%" in summary
+
+    # 文件已是最新，热加载不会重复发布
+    assert service.reload() is False
+    with open(os.path.join(data_dir, "user_model.json"), 'r', encoding='utf-8') as f:
+        assert json.load(f)["preference_weights"]["topics"]["科技进展"] == pytest.approx(0.6)
+
+    print("✅ 反馈合并测试通过")
@@ -0,0 +1,58 @@
+"""
+重写缓存测试
+"""
+
+import os
+import sys
+import time
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.rewrite_cache import RewriteCache
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    """测试LRU命中、SQLite命中和命中率统计"""
+    db_path = str(tmp_path / "rewrite.db")
+
+    cache = RewriteCache(db_path, purge_interval=0)
+    assert cache.get("a") is None
+    cache.put("a", "重写A")
+    assert cache.get("a") == "重写A"
+    cache.close()
+
+    reopened = RewriteCache(db_path, purge_interval=0)
+    assert reopened.get("a") == "重写A"
+    assert reopened.get("a") == "重写A"
+
+    stats = reopened.get_stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["hit_ratio"] == 1.0
+    reopened.close()
+
+    print("✅ 两级缓存测试通过")
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    """测试过期清理和超出容量淘汰"""
+    cache = RewriteCache(str(tmp_path / "rewrite.db"), ttl_hours=0.1 / 3600, max_entries=2, purge_interval=0)
+
+    cache.put("a", "A")
+    time.sleep(0.15)
+    assert cache.get("a") is None
+    assert cache.purge_expired() == 1
+
+    cache.ttl_seconds = 3600
+    for key in ["b", "c", "d"]:
+        cache.put(key, key.upper())
+        time.sleep(0.01)
+
+    assert cache.get("b") is None
+    assert cache.get("d") == "D"
+    assert cache.get_stats()["evicted"] == 1
+    assert cache.get_stats()["entries"] == 2
+    cache.close()
+
+    print("✅ 过期与淘汰测试通过")
@@ -0,0 +1,77 @@
+"""
+分块翻译测试
+"""
+
+import os
+import sys
+
+# 添加src到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.chunked_translator import ChunkedTranslator, split_into_chunks, split_sentences
+
+
+def fake_translate(text, target_lang, max_tokens):
+    """把每个块包上标记，便于检查顺序"""
+    return f"<{text}>"
+
+
+def test_split_sentences_keeps_decimals():
+    """测试句子切分不会切开小数"""
+    sentences = split_sentences("GDP grew 5.2 percent. 科技取得突破。好的")
+
+    assert sentences == ["GDP grew 5.2 percent. ", "科技取得突破。", "好的"]
+
+    print("✅ 句子切分测试通过")
+
+
+def test_chunks_respect_token_budget():
+    """测试分块不超过token上限并覆盖全文"""
+    paragraph = "This is sentence number one. " * 40
+    text = "\n\n".join([paragraph] * 3)
+
+    chunks = split_into_chunks(text, 100)
+
+    assert len(chunks) > 3
+    assert chunks[-1][1] == ""
+    assert "".join(c[0] for c in chunks).replace(" ", "") == text.replace(" ", "").replace("\n", "")
+
+    print("✅ 分块测试通过")
+
+
+def test_translate_stitches_in_order():
+    """测试并行翻译后按原顺序拼接"""
+    translator = ChunkedTranslator(fake_translate, max_chunk_tokens=5, max_workers=4)
+    text = "第一段第一句。第一段第二句。\n\n第二段。"
+
+    result = translator.translate(text)
+
+    assert result == "<第一段第一句。><第一段第二句。>\n\n<第二段。>"
+    assert translator.get_stats()["chunks"] == 3
+
+    print("✅ 拼接顺序测试通过")
+
+
+def test_translation_memory_reuses_sentences(tmp_path):
+    """测试翻译记忆复用已翻译的句子"""
+    from src.translation_memory import TranslationMemory
+
+    calls = []
+
+    def fake_segments(sentences, target_lang, max_tokens):
+        calls.append(list(sentences))
+        return [f"<{s}>" for s in sentences]
+
+    memory = TranslationMemory(str(tmp_path / "tm.json"))
+    translator = ChunkedTranslator(fake_translate, segments_fn=fake_segments, memory=memory)
+
+    translator.translate("Beijing announced a new plan. Markets rose.")
+    memory.begin_run()
+    result = translator.translate("Markets  rose. A new sentence.")
+
+    assert calls[-1] == ["A new sentence."]
+    assert result == "<Markets rose.><A new sentence.>"
+    assert memory.get_stats()["run_hit_rate"] == 0.5
+    assert TranslationMemory(str(tmp_path / "tm.json")).get_stats()["entries"] == 3
+
+    print("✅ 翻译记忆测试通过")